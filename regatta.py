@@ -1,23 +1,2482 @@
-import tkinter as tk
-from tkinter import messagebox, ttk, filedialog, simpledialog
 import serial
-import serial.tools.list_ports
 import time
 import os
-from datetime import datetime
-from threading import Thread
+from datetime import datetime, timedelta
+from threading import Thread, Condition, Lock, Event, main_thread
+from collections import deque, OrderedDict, namedtuple, Counter
+from array import array
+import argparse
+import bisect
+import codecs
 import json
+import mmap
+import random
+import re
+import sys
+import ctypes
+import select
+import struct
+import tempfile
+import traceback
+
+# tkinter is only imported by import_tk(), so the command-line tools start
+# fast and also run on machines without Tk
+tk = messagebox = ttk = filedialog = simpledialog = None
+
+
+def import_tk():
+    global tk, messagebox, ttk, filedialog, simpledialog
+    import tkinter as tk
+    from tkinter import messagebox, ttk, filedialog, simpledialog
+
+
+# Likewise asyncio and the network modules, which only the push interface needs
+asyncio = base64 = socket = urllib = None
+
+
+def import_push():
+    global asyncio, base64, socket, urllib
+    import asyncio
+    import base64
+    import socket
+    import urllib.error
+    import urllib.request
+
 
 NUM_ROWS = 8
 NUM_COLS = 30
+FRAME_SIZE = NUM_ROWS * NUM_COLS
+FRAME_HEADER = bytes([0x01, 0xFF])
+BRIGHTNESS_COMMAND = FRAME_HEADER + bytes([0x03])
+ENCODING = 'iso-8859-1'
+LAZY_ANIMATION_BYTES = 1024 * 1024  # larger animation files are memory-mapped
+
+
+VALID_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789äöüÄÖÜ .,!?|-:+*/\\()=#%<>')
+REPLACEMENT_CHAR = '?'
+
+
+# Nearest spelling the display can show, used instead of REPLACEMENT_CHAR
+FALLBACK_CHARS = {
+    'ß': 'ss', 'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE',
+    'á': 'a', 'à': 'a', 'â': 'a', 'å': 'a', 'ã': 'a', 'ą': 'a',
+    'Á': 'A', 'À': 'A', 'Â': 'A', 'Å': 'A', 'Ã': 'A',
+    'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e', 'ě': 'e', 'ę': 'e',
+    'É': 'E', 'È': 'E', 'Ê': 'E', 'Ë': 'E',
+    'í': 'i', 'ì': 'i', 'î': 'i', 'ï': 'i', 'Í': 'I', 'Î': 'I',
+    'ó': 'o', 'ò': 'o', 'ô': 'o', 'õ': 'o', 'ø': 'o', 'Ó': 'O', 'Ò': 'O', 'Ô': 'O', 'Ø': 'O',
+    'ú': 'u', 'ù': 'u', 'û': 'u', 'ů': 'u', 'Ú': 'U', 'Ù': 'U', 'Û': 'U',
+    'ç': 'c', 'č': 'c', 'ć': 'c', 'Ç': 'C', 'Č': 'C', 'Ć': 'C',
+    'ñ': 'n', 'ń': 'n', 'ň': 'n', 'Ñ': 'N', 'ł': 'l', 'Ł': 'L', 'ř': 'r', 'Ř': 'R',
+    'š': 's', 'ś': 's', 'Š': 'S', 'Ś': 'S', 'ž': 'z', 'ź': 'z', 'ż': 'z', 'Ž': 'Z',
+    'ý': 'y', 'ÿ': 'y', 'Ý': 'Y',
+    '–': '-', '—': '-', '_': '-', '&': '+', ';': ',', '[': '(', ']': ')', '{': '(', '}': ')',
+    '€': 'EUR', '\t': ' ', '\xa0': ' ',
+}
+
+
+def sanitize_text(text, valid_chars=VALID_CHARS, replacement=REPLACEMENT_CHAR):
+    """Replace every character the display cannot show (per character, no fallbacks)."""
+    return ''.join(char if char in valid_chars else replacement for char in text)
+
+
+# Characters outside ISO-8859-1 become NUL, which the byte table then replaces
+codecs.register_error('led-unmappable', lambda error: ('\x00' * (error.end - error.start), error.end))
+
+
+class Transcoder:
+    """Converts text to display bytes with precomputed translation tables.
+
+    A whole line, frame or file takes three C-level passes: str.translate
+    applies the fallback spellings, the ISO-8859-1 encode maps anything
+    outside Latin-1 to NUL, and bytes.translate replaces every byte the
+    board cannot show. Line breaks pass through unchanged.
+    """
+
+    def __init__(self, valid_chars=VALID_CHARS, replacement=REPLACEMENT_CHAR, fallbacks=FALLBACK_CHARS):
+        self.valid_chars = frozenset(valid_chars)
+        self.replacement = replacement
+        # A fallback is only used if the board can show its spelling
+        self.fallbacks = {char: text for char, text in fallbacks.items()
+                          if len(char) == 1 and char not in self.valid_chars
+                          and set(text) <= self.valid_chars}
+        self.str_table = str.maketrans(self.fallbacks) if self.fallbacks else None
+        replacement_byte = replacement.encode(ENCODING)[0]
+        self.byte_table = bytes(byte if chr(byte) in self.valid_chars or byte == 0x0A else replacement_byte
+                                for byte in range(256))
+
+    def encode(self, text):
+        """Display bytes for text; fallback spellings can make it longer."""
+        if self.str_table:
+            text = text.translate(self.str_table)
+        return text.encode(ENCODING, 'led-unmappable').translate(self.byte_table)
+
+    def sanitize(self, text):
+        return self.encode(text).decode(ENCODING)
+
+    def sanitize_lines(self, lines):
+        return self.sanitize('\n'.join(lines)).split('\n')
+
+    def encode_frame(self, lines):
+        """The 240 bytes of one frame, up to NUM_ROWS lines converted in one call."""
+        rows = self.encode('\n'.join(lines[:NUM_ROWS])).split(b'\n')
+        rows += [b''] * (NUM_ROWS - len(rows))
+        return b''.join(row[:NUM_COLS].ljust(NUM_COLS) for row in rows[:NUM_ROWS])
+
+
+DEFAULT_TRANSCODER = Transcoder()
+
+
+def encode_row(text):
+    """Pad or cut text to NUM_COLS and encode it for the display."""
+    return text[:NUM_COLS].ljust(NUM_COLS).encode(ENCODING, errors='replace')
+
+
+def encode_frame(lines):
+    """Encode up to NUM_ROWS lines into the 240 bytes of one frame."""
+    lines = list(lines[:NUM_ROWS]) + [''] * (NUM_ROWS - len(lines[:NUM_ROWS]))
+    return b''.join(encode_row(line) for line in lines)
+
+
+def build_message(frame):
+    """Wrap 240 frame bytes into the 0x01 0xFF display message."""
+    return FRAME_HEADER + bytes(frame)
+
+
+class FrameBuffer:
+    """Authoritative 8x30 display content, kept as ISO-8859-1 bytes.
+
+    The GUI grid is only a view of this buffer; the serial path reads the
+    bytes directly without touching Tk.
+    """
+
+    def __init__(self, lines=None):
+        self.data = bytearray(b' ' * FRAME_SIZE)
+        if lines:
+            self.set_rows(lines)
+
+    def clear(self):
+        self.data[:] = b' ' * FRAME_SIZE
+
+    def set_cell(self, row, col, char):
+        self.data[row * NUM_COLS + col] = encode_row(char[:1] or ' ')[0]
+
+    def get_row(self, row):
+        start = row * NUM_COLS
+        return self.data[start:start + NUM_COLS].decode(ENCODING)
+
+    def set_row(self, row, text):
+        start = row * NUM_COLS
+        self.data[start:start + NUM_COLS] = encode_row(text)
+
+    def set_rows(self, lines):
+        """Replace the whole frame; missing lines are blanked."""
+        self.data[:] = encode_frame(lines)
+
+    def set_frame(self, frame):
+        """Replace the whole frame with 240 already encoded bytes."""
+        if len(frame) != FRAME_SIZE:
+            raise ValueError(f"Frame muss {FRAME_SIZE} Bytes haben, nicht {len(frame)}")
+        self.data[:] = frame
+
+    def rows(self):
+        return [self.get_row(row) for row in range(NUM_ROWS)]
+
+    def to_bytes(self):
+        return bytes(self.data)
+
+    def to_message(self):
+        return build_message(self.data)
+
+
+BAUDRATE = 38400
+
+
+def wire_time(nbytes, baudrate=BAUDRATE):
+    """Seconds needed to clock nbytes out at 8N1 (10 bits per byte)."""
+    return nbytes * 10 / baudrate
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+class CompiledAnimation:
+    """Animation with each frame prebuilt as a ready-to-send display message.
+
+    Identical frames share one message; `sequence` holds the message
+    index of every frame in playback order. `loops` is None for unlimited.
+    """
+
+    complete = True
+
+    def __init__(self, mode="LOOP", fps=2, loops=None):
+        self.mode = mode
+        self.fps = fps
+        self.loops = loops
+        self.messages = []
+        self.sequence = []
+        self.message_index = {}
+
+    def add_frame(self, frame):
+        message = build_message(frame)
+        index = self.message_index.get(message)
+        if index is None:
+            index = self.message_index[message] = len(self.messages)
+            self.messages.append(message)
+        self.sequence.append(index)
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def has_frame(self, position):
+        return position < len(self.sequence)
+
+    def message(self, position):
+        return self.messages[self.sequence[position]]
+
+    def summary(self):
+        return f"{len(self.sequence)} Frames, {len(self.messages)} verschieden"
+
+    def close(self):
+        pass
+
+
+def parse_animation(content, transcoder=None):
+    """Compile an animation text file (#MODE/#FPS/#LOOPS, FRAME blocks ended by ==)."""
+    transcoder = transcoder or DEFAULT_TRANSCODER
+    animation = CompiledAnimation()
+    current = []
+    loops_set = False
+    for line in content.splitlines():
+        if line.strip().startswith("#MODE:"):
+            animation.mode = line.strip().split(":", 1)[1].strip().upper()
+        elif line.strip().startswith("#FPS:"):
+            try:
+                animation.fps = max(1, int(line.strip().split(":", 1)[1].strip()))
+            except Exception:
+                animation.fps = 2
+        elif line.strip().startswith("#LOOPS:"):
+            value = line.strip().split(":", 1)[1].strip().lower()
+            loops_set = True
+            try:
+                animation.loops = None if value == "unlimited" else max(1, int(value))
+            except ValueError:
+                animation.loops = None
+        elif line.strip().startswith("FRAME"):
+            current = []
+        elif line.strip() == "==":
+            if len(current) == NUM_ROWS:
+                animation.add_frame(transcoder.encode_frame(current))
+            current = []
+        else:
+            if len(current) < NUM_ROWS:
+                current.append(line)
+    if len(current) == NUM_ROWS:
+        animation.add_frame(transcoder.encode_frame(current))
+    if animation.mode == "ONCE":
+        animation.loops = 1
+    elif not loops_set:
+        animation.loops = None
+    return animation
+
+
+class AnimationFile:
+    """Memory-mapped animation file, indexed and decoded lazily.
+
+    Only the #MODE/#FPS/#LOOPS header is read up front. Frame boundaries
+    are indexed in chunks as playback reaches them, into two compact
+    offset arrays, and decoded frames are kept in a small LRU. Memory
+    use does not depend on the file length beyond 16 bytes per frame.
+    """
+
+    BOUNDARY = re.compile(rb'^[ \t]*(?:FRAME[^\n]*|==[ \t]*\r?)$', re.MULTILINE)
+    INDEX_CHUNK = 256  # frames indexed per step
+    CACHE_SIZE = 64  # decoded frames kept
+
+    def __init__(self, filename, transcoder=None, encoding='utf-8'):
+        self.transcoder = transcoder or DEFAULT_TRANSCODER
+        self.encoding = encoding
+        self.mode = "LOOP"
+        self.fps = 2
+        self.loops = None
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self.cache = OrderedDict()
+        self.complete = False
+
+        self.file = open(filename, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self.map = b''
+        self.boundaries = self.BOUNDARY.finditer(self.map)
+        first = self.BOUNDARY.search(self.map)
+        self.read_header(self.map[:first.start() if first else len(self.map)])
+        self.frame_start = 0
+
+    def read_header(self, header):
+        loops_set = False
+        for line in header.decode(self.encoding, errors='replace').splitlines():
+            line = line.strip()
+            if line.startswith("#MODE:"):
+                self.mode = line.split(":", 1)[1].strip().upper()
+            elif line.startswith("#FPS:"):
+                try:
+                    self.fps = max(1, int(line.split(":", 1)[1].strip()))
+                except ValueError:
+                    self.fps = 2
+            elif line.startswith("#LOOPS:"):
+                value = line.split(":", 1)[1].strip().lower()
+                loops_set = True
+                try:
+                    self.loops = None if value == "unlimited" else max(1, int(value))
+                except ValueError:
+                    self.loops = None
+        if self.mode == "ONCE":
+            self.loops = 1
+        elif not loops_set:
+            self.loops = None
+
+    def index_more(self):
+        """Index the next chunk of frames; returns False once the file is exhausted."""
+        if self.complete:
+            return False
+        target = len(self.starts) + self.INDEX_CHUNK
+        for match in self.boundaries:
+            if match.group().lstrip().startswith(b"FRAME"):
+                self.frame_start = match.end() + 1
+                continue
+            self.add_frame(self.frame_start, match.start())
+            self.frame_start = match.end() + 1
+            if len(self.starts) >= target:
+                return True
+        # Trailing frame without closing ==
+        self.add_frame(self.frame_start, len(self.map))
+        self.complete = True
+        return False
+
+    def add_frame(self, start, end):
+        if start >= end:
+            return
+        body = self.map[start:end]
+        lines = body.count(b'\n') + (0 if body.endswith(b'\n') else 1)
+        if lines >= NUM_ROWS:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def has_frame(self, position):
+        while position >= len(self.starts):
+            if not self.index_more() and position >= len(self.starts):
+                return False
+        return True
+
+    def __len__(self):
+        """Frames indexed so far; the total once `complete` is set."""
+        if not self.starts:
+            self.index_more()
+        return len(self.starts)
+
+    def message(self, position):
+        message = self.cache.get(position)
+        if message is not None:
+            self.cache.move_to_end(position)
+            return message
+        if not self.has_frame(position):
+            raise IndexError(position)
+        body = self.map[self.starts[position]:self.ends[position]]
+        lines = body.decode(self.encoding, errors='replace').splitlines()[:NUM_ROWS]
+        message = build_message(self.transcoder.encode_frame(lines))
+        self.cache[position] = message
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return message
+
+    def summary(self):
+        total = len(self.starts) if self.complete else f"{len(self.starts)}+"
+        return f"{total} Frames, verzögert geladen"
+
+    def close(self):
+        self.boundaries = None  # the scanner holds a view of the map
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+def open_animation(filename, transcoder=None):
+    """Compile small animation files, memory-map large ones."""
+    if os.path.getsize(filename) > LAZY_ANIMATION_BYTES:
+        return AnimationFile(filename, transcoder)
+    with open(filename, "r", encoding="utf-8") as f:
+        return parse_animation(f.read(), transcoder)
+
+
+def advance_position(animation, index, loop, count):
+    """Move count frames on, wrapping per #LOOPS.
+
+    Returns (index, loop, playing); playing is False once the last loop is over.
+    """
+    index += count
+    while not animation.has_frame(index):
+        # has_frame() only fails once the animation is fully indexed
+        length = len(animation)
+        index -= length
+        loop += 1
+        if animation.loops is not None and loop >= animation.loops:
+            return length - 1, loop, False
+    return index, loop, True
+
+
+def max_frame_rate(baudrate=BAUDRATE, message_bytes=len(FRAME_HEADER) + FRAME_SIZE):
+    """Highest frame rate the serial link can carry without queueing up."""
+    return 1 / wire_time(message_bytes, baudrate)
+
+
+TICKER_FPS = 6  # columns per second; FrameClock caps it at the link rate
+
+
+class Ticker:
+    """Scrolling text on some rows over a static frame, played like an animation.
+
+    The text of every ticker row is encoded once, with a blank display
+    width before and after it, so it scrolls in from the right and out to
+    the left; frame n shows columns n to n + NUM_COLS of that buffer.
+    message() joins these slices with the untouched parts of the static
+    frame, so a scroll step neither lays out nor encodes anything. Rows
+    of different length wrap independently; the animation lasts as long
+    as the longest one.
+    """
+
+    complete = True
+    mode = "TICKER"
+
+    def __init__(self, lines, static=None, fps=TICKER_FPS, loops=None, transcoder=None):
+        """lines maps row numbers (0-based) to text; static is 240 encoded bytes."""
+        transcoder = transcoder or DEFAULT_TRANSCODER
+        self.fps = fps
+        self.loops = loops
+        self.static = memoryview(bytes(static) if static is not None else b' ' * FRAME_SIZE)
+        blank = b' ' * NUM_COLS
+        self.rows = []  # (row, buffer, steps)
+        for row, text in sorted(lines.items()):
+            if not 0 <= row < NUM_ROWS:
+                raise ValueError(f"Zeile 1-{NUM_ROWS} erwartet, nicht {row + 1}")
+            encoded = transcoder.encode(' '.join(text.split()))
+            self.rows.append((row, memoryview(blank + encoded + blank), len(encoded) + NUM_COLS))
+        self.length = max((steps for _, _, steps in self.rows), default=1)
+
+    def __len__(self):
+        return self.length
+
+    def has_frame(self, position):
+        return position < self.length
+
+    def message(self, position):
+        parts = [FRAME_HEADER]
+        start = 0
+        for row, buffer, steps in self.rows:
+            offset = position % steps
+            parts.append(self.static[start:row * NUM_COLS])
+            parts.append(buffer[offset:offset + NUM_COLS])
+            start = (row + 1) * NUM_COLS
+        parts.append(self.static[start:])
+        return b''.join(parts)
+
+    def __iter__(self):
+        """One pass, building each message only when it is asked for."""
+        for position in range(self.length):
+            yield self.message(position)
+
+    def summary(self):
+        return f"Laufschrift, {self.length} Schritte"
+
+    def close(self):
+        pass
+
+
+class FrameClock:
+    """Frame scheduler on the monotonic clock with absolute deadlines.
+
+    Frame n is due at start + n * period, so the time spent rendering and
+    sending a frame does not stretch the interval. A tick arriving one or
+    more periods late skips the missed frames instead of accumulating lag.
+    """
+
+    def __init__(self, fps, max_fps=None):
+        self.max_fps = max_fps or max_frame_rate()
+        self.intervals = deque(maxlen=100)  # seconds between ticks
+        self.lateness = deque(maxlen=100)  # seconds behind the deadline
+        self.frames_dropped = 0
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """Change the rate; capped at what the link sustains. Restarts the deadlines."""
+        self.fps = max(0.1, min(float(fps), self.max_fps))
+        self.period = 1 / self.fps
+        self.restart()
+
+    def restart(self):
+        self.start_time = time.monotonic()
+        self.frame_number = 0
+        self.last_tick = None
+
+    def tick(self):
+        """Mark the current frame as shown; returns how many frames were skipped first."""
+        now = time.monotonic()
+        if self.last_tick is not None:
+            self.intervals.append(now - self.last_tick)
+        self.last_tick = now
+        late = now - (self.start_time + self.frame_number * self.period)
+        skipped = max(0, int(late / self.period))
+        self.frame_number += skipped + 1
+        self.frames_dropped += skipped
+        self.lateness.append(late - skipped * self.period)
+        return skipped
+
+    def delay(self):
+        """Seconds until the next frame is due (never negative)."""
+        return max(0.0, self.start_time + self.frame_number * self.period - time.monotonic())
+
+    def delay_ms(self):
+        return int(round(self.delay() * 1000))
+
+    def stats(self):
+        intervals = list(self.intervals)
+        lateness = list(self.lateness)
+        stats = {'target_fps': self.fps, 'frames_dropped': self.frames_dropped}
+        if intervals:
+            stats['measured_fps'] = len(intervals) / sum(intervals) if sum(intervals) else 0.0
+        if lateness:
+            mean = sum(lateness) / len(lateness)
+            stats['jitter_ms'] = (sum((x - mean) ** 2 for x in lateness) / len(lateness)) ** 0.5 * 1000
+        return stats
+
+
+class SerialWriter:
+    """Dedicated writer thread in front of the serial port.
+
+    Messages wait in a small bounded queue. A frame still waiting when a
+    newer frame arrives is dropped (latest frame wins); other commands such
+    as the brightness command are never coalesced, and are queued past
+    `max_pending` rather than dropped.
+    """
+
+    def __init__(self, ser, max_pending=4, on_error=None, recorder=None):
+        self.ser = ser
+        self.max_pending = max_pending
+        self.on_error = on_error
+        self.recorder = recorder  # SessionRecorder for every frame written; closed with the writer
+        self.pending = deque()  # (message, coalesce, queued_at, on_written, source)
+        self.condition = Condition()
+        self.busy = False
+        self.busy_since = None  # queued_at of the message being written
+        self.running = True
+        self.started = time.perf_counter()
+
+        self.frames_written = 0
+        self.frames_coalesced = 0
+        self.bytes_written = 0
+        self.latencies = deque(maxlen=500)  # (queue wait, write time) in seconds
+
+        self.thread = Thread(target=self.run, name="serial-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, message, coalesce=True, on_written=None, source=None):
+        """Queue a message for sending; returns immediately.
+
+        on_written(finished) is called on the writer thread with the
+        perf_counter time once the message is on the wire. `source` is
+        what the session log records for a frame (see SESSION_SOURCES).
+        """
+        with self.condition:
+            if coalesce:
+                for item in self.pending:
+                    if item[1]:
+                        self.pending.remove(item)
+                        self.frames_coalesced += 1
+                        break
+            if len(self.pending) >= self.max_pending:
+                # Make room by dropping the oldest frame, never a command
+                for item in self.pending:
+                    if item[1]:
+                        self.pending.remove(item)
+                        self.frames_coalesced += 1
+                        break
+            self.pending.append((bytes(message), coalesce, time.perf_counter(), on_written, source))
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                message, _, queued_at, on_written, source = self.pending.popleft()
+                self.busy = True
+                self.busy_since = queued_at
+            try:
+                started = time.perf_counter()
+                self.ser.write(message)
+                self.ser.flush()
+                finished = time.perf_counter()
+                with self.condition:
+                    self.frames_written += 1
+                    self.bytes_written += len(message)
+                    self.latencies.append((started - queued_at, finished - started))
+                if self.recorder and len(message) == len(FRAME_HEADER) + FRAME_SIZE:
+                    self.recorder.record(message[len(FRAME_HEADER):], source)
+                if on_written:
+                    try:
+                        on_written(finished)
+                    except Exception as e:  # a broken callback must not stop the board
+                        if self.on_error:
+                            self.on_error(e)
+            except (serial.SerialException, OSError) as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.busy_since = None
+                    self.condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Block until everything queued has been written; False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self.condition:
+            while self.pending or self.busy:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def backlog(self):
+        """Messages not yet on the wire, including the one being written."""
+        with self.condition:
+            return len(self.pending) + self.busy
+
+    def stats(self):
+        now = time.perf_counter()
+        with self.condition:
+            latencies = list(self.latencies)
+            stats = {
+                'frames_written': self.frames_written,
+                'frames_coalesced': self.frames_coalesced,
+                'bytes_written': self.bytes_written,
+                'pending': len(self.pending),
+                'bytes_per_second': self.bytes_written / max(now - self.started, 1e-9),
+            }
+            # Age of the oldest message not yet on the wire; grows without
+            # bound while a write hangs, even though coalescing keeps the
+            # queue itself short
+            oldest = [queued_at for _, _, queued_at, _, _ in self.pending]
+            if self.busy_since is not None:
+                oldest.append(self.busy_since)
+            stats['lag_ms'] = (now - min(oldest)) * 1000 if oldest else 0.0
+        if latencies:
+            stats['last_latency_ms'] = sum(latencies[-1]) * 1000
+            stats['avg_wait_ms'] = sum(w for w, _ in latencies) / len(latencies) * 1000
+            stats['avg_write_ms'] = sum(t for _, t in latencies) / len(latencies) * 1000
+        return stats
+
+    def close(self, timeout=1.0):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        if self.recorder:
+            self.recorder.close()
+
+
+SESSION_LOG = "regatta_session_%Y%m%d.bin"  # strftime pattern: one log per day
+SESSION_SOURCES = ('manual', 'race_results', 'animation', 'template', 'push', 'initialization', 'replay',
+                   'playlist')
+SESSION_RECORD = struct.Struct('<Q240s')  # 248 bytes
+SESSION_TIME_MASK = (1 << 56) - 1
+SessionRecord = namedtuple('SessionRecord', 'time source frame')
+
+
+def count_session_records(data):
+    """Records in use; the zero-filled tail of a preallocated log does not count."""
+    low, high = 0, len(data) // SESSION_RECORD.size
+    while low < high:
+        middle = (low + high) // 2
+        offset = middle * SESSION_RECORD.size
+        if data[offset:offset + 8] == bytes(8):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class SessionRecorder:
+    """Append-only binary log of the frames put on the wire.
+
+    Each record is 248 bytes: a little-endian 64-bit word with the Unix
+    time in microseconds in its low 56 bits and the source (index into
+    SESSION_SOURCES, 255 if unknown) in the top byte, then the 240 frame
+    bytes. The file grows CHUNK records at a time and is written through
+    a memory map; close() cuts off the unused, zero-filled tail. An
+    existing log is continued. The file is locked while open, so a second
+    process cannot overwrite the records of the first.
+    """
+
+    CHUNK = 4096  # records, about 1 MB
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.file = open(path, 'a+b')
+        if not lock_file(self.file):
+            self.file.close()
+            raise OSError(f"{path} wird schon von einem anderen Programm aufgezeichnet")
+        self.map = None
+        self.count = 0
+        if os.fstat(self.file.fileno()).st_size >= SESSION_RECORD.size:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.count = count_session_records(self.map)
+
+    def record(self, frame, source=None, when=None):
+        code = SESSION_SOURCES.index(source) if source in SESSION_SOURCES else 255
+        header = code << 56 | int((time.time() if when is None else when) * 1e6) & SESSION_TIME_MASK
+        with self.lock:
+            if self.file is None:
+                return
+            try:
+                if self.map is None or (self.count + 1) * SESSION_RECORD.size > len(self.map):
+                    self.grow()
+                SESSION_RECORD.pack_into(self.map, self.count * SESSION_RECORD.size, header, bytes(frame))
+                self.count += 1
+            except OSError:
+                self.close_file()  # e.g. disk full; the board must keep running
+
+    def grow(self):
+        if self.map is not None:
+            self.map.close()
+        os.ftruncate(self.file.fileno(), (self.count + self.CHUNK) * SESSION_RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def close(self):
+        with self.lock:
+            self.close_file()
+
+    def close_file(self):
+        if self.file is None:
+            return
+        try:
+            if self.map is not None:
+                self.map.close()
+            os.ftruncate(self.file.fileno(), self.count * SESSION_RECORD.size)
+        except OSError:
+            pass
+        self.map = None
+        self.file.close()
+        self.file = None
+
+
+def lock_file(f):
+    """Exclusive lock on an open file without waiting; False if another process holds it."""
+    try:
+        if sys.platform == 'win32':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def open_session_recorder(pattern):
+    """Recorder for today's log per the strftime pattern; None if disabled or not writable."""
+    if not pattern:
+        return None
+    try:
+        return SessionRecorder(datetime.now().strftime(pattern))
+    except (OSError, ValueError) as e:
+        print(f"Keine Sitzungsaufzeichnung: {e}", file=sys.stderr)
+        return None
+
+
+def read_session(path):
+    """Yield the SessionRecords of a log in order."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < SESSION_RECORD.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for index in range(count_session_records(data)):
+                header, frame = SESSION_RECORD.unpack_from(data, index * SESSION_RECORD.size)
+                code = header >> 56
+                yield SessionRecord((header & SESSION_TIME_MASK) / 1e6,
+                                    SESSION_SOURCES[code] if code < len(SESSION_SOURCES) else 'unknown', frame)
+
+DisplayEvent = namedtuple('DisplayEvent', 'kind time data detail')  # kind: frame, brightness, error
+
+
+BOARD_MAIN = "Haupttafel"  # name of the board on --port / last_port
+
+Board = namedtuple('Board', 'name port writer sources')  # sources: None or a set from SESSION_SOURCES
+
+
+class BoardFanout:
+    """Several boards behind the interface of a single SerialWriter.
+
+    Every board has its own writer thread, so a slow or wedged adapter
+    only fills (and coalesces) its own queue while the others keep up.
+    A message goes to every board whose sources include the message
+    source, a board without sources takes everything; submit(boards=...)
+    sends to the named boards only, which is how one board shows a
+    different frame than the rest. Commands without a source, like the
+    brightness command, reach every board.
+
+    on_written and the session recorder fire once per message, for the
+    first board that gets it on the wire.
+    """
+
+    def __init__(self, boards, recorder=None):
+        self.boards = boards
+        self.names = [board.name for board in boards]
+        self.recorder = recorder
+        self.max_pending = min(board.writer.max_pending for board in boards)
+        self.lock = Lock()
+
+    def targets(self, source=None, boards=None):
+        if boards is not None:
+            unknown = [name for name in boards if name not in self.names]
+            if unknown:
+                raise ValueError(f"Unbekannte Tafel: {', '.join(unknown)}")
+            return [board for board in self.boards if board.name in boards]
+        return [board for board in self.boards
+                if source is None or not board.sources or source in board.sources]
+
+    def submit(self, message, coalesce=True, on_written=None, source=None, boards=None):
+        """Queue a message on every target board; raises ValueError for unknown board names."""
+        first = []
+
+        def written(finished):
+            with self.lock:
+                if first:
+                    return
+                first.append(finished)
+                if self.recorder and len(message) == len(FRAME_HEADER) + FRAME_SIZE:
+                    self.recorder.record(message[len(FRAME_HEADER):], source)
+            if on_written:
+                on_written(finished)
+
+        for board in self.targets(source, boards):
+            board.writer.submit(message, coalesce, written, source)
+
+    def backlog(self):
+        """Backlog of the fastest board; slower boards coalesce instead of holding everyone up."""
+        return min(board.writer.backlog() for board in self.boards)
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for board in self.boards:
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            if not board.writer.wait_idle(remaining):
+                return False
+        return True
+
+    def stats(self):
+        """Sums over all boards, latencies of the main board, and per board under 'boards'."""
+        per_board = {board.name: board.writer.stats() for board in self.boards}
+        stats = dict(per_board[self.names[0]])
+        for key in ('frames_written', 'frames_coalesced', 'bytes_written', 'pending', 'bytes_per_second'):
+            stats[key] = sum(board_stats[key] for board_stats in per_board.values())
+        stats['lag_ms'] = max(board_stats['lag_ms'] for board_stats in per_board.values())
+        stats['boards'] = per_board
+        return stats
+
+    def close(self, timeout=1.0):
+        for board in self.boards:
+            board.writer.close(timeout)
+        if self.recorder:
+            self.recorder.close()
+
+
+def parse_board_spec(spec):
+    """NAME=PORT[@QUELLE,...] from the command line into a board config."""
+    name, sep, rest = spec.partition('=')
+    port, _, sources = rest.partition('@')
+    if not sep or not name or not port:
+        raise argparse.ArgumentTypeError(f"NAME=PORT erwartet, nicht {spec!r}")
+    sources = [source for source in sources.split(',') if source]
+    unknown = [source for source in sources if source not in SESSION_SOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unbekannte Quelle: {', '.join(unknown)}")
+    return {'name': name, 'port': port, 'sources': sources}
+
+
+def open_writer(ser, boards=None, on_error=None, recorder=None, baudrate=BAUDRATE):
+    """SerialWriter for the main port, or a BoardFanout when further boards are configured.
+
+    boards is a list of {"name", "port", "sources"} configs; a board whose
+    port cannot be opened is reported through on_error and left out.
+    """
+    if not boards:
+        return SerialWriter(ser, on_error=on_error, recorder=recorder)
+
+    def board_error(name):
+        return lambda e: on_error and on_error(serial.SerialException(f"{name}: {e}"))
+
+    fanout = [Board(BOARD_MAIN, getattr(ser, 'port', None), SerialWriter(ser, on_error=board_error(BOARD_MAIN)),
+                    None)]
+    for config in boards:
+        try:
+            board_ser = open_serial(config['port'], baudrate)
+        except serial.SerialException as e:
+            board_error(config['name'])(e)
+            continue
+        fanout.append(Board(config['name'], config['port'],
+                            SerialWriter(board_ser, on_error=board_error(config['name'])),
+                            set(config.get('sources') or ()) or None))
+    return BoardFanout(fanout, recorder)
+
+
+class DisplayDecoder:
+    """Parses the byte stream the way the board's controller sees it.
+
+    A message starts with 0x01 0xFF; a following 0x03 is the brightness
+    command, anything else the first of the 240 frame bytes. Neither
+    header byte is displayable, so a header inside a frame means the frame
+    was cut short. Bytes outside a message and frames that stall for
+    `frame_timeout` are reported as errors.
+
+    Timing follows the modelled line: bytes are clocked in at 10 bits
+    each, no earlier than they were received, and every event carries the
+    time its last byte would arrive at the board.
+    """
+
+    def __init__(self, baudrate=BAUDRATE, frame_timeout=0.1):
+        self.byte_time = wire_time(1, baudrate)
+        self.frame_timeout = frame_timeout
+        self.buffer = bytearray()
+        self.wire_free = 0.0  # modelled arrival time of the last byte seen
+        self.backlog = 0.0  # how far the line lags behind the sender, in seconds
+
+    def feed(self, data, now):
+        """Parse bytes received at `now`; returns the completed DisplayEvents."""
+        events = []
+        if self.buffer and now - self.wire_free > self.frame_timeout:
+            events.append(self.error(f"Nachricht nach {len(self.buffer)} Bytes abgebrochen"))
+            del self.buffer[:]
+        self.wire_free = max(now, self.wire_free) + len(data) * self.byte_time
+        self.backlog = self.wire_free - now
+        self.buffer += data
+        while self.buffer:
+            start = self.buffer.find(FRAME_HEADER)
+            if start < 0:
+                # Keep a trailing 0x01, it may be the start of the next header
+                start = len(self.buffer) - 1 if self.buffer[-1] == FRAME_HEADER[0] else len(self.buffer)
+            if start:
+                del self.buffer[:start]
+                events.append(self.error(f"{start} Bytes ohne Kopf"))
+                continue
+            if len(self.buffer) < len(BRIGHTNESS_COMMAND):
+                break
+            if self.buffer[2] == BRIGHTNESS_COMMAND[2]:
+                del self.buffer[:len(BRIGHTNESS_COMMAND)]
+                events.append(DisplayEvent('brightness', self.event_time(), None, ''))
+                continue
+            end = len(FRAME_HEADER) + FRAME_SIZE
+            cut = self.buffer.find(FRAME_HEADER, len(FRAME_HEADER), end)
+            if cut >= 0:
+                del self.buffer[:cut]
+                events.append(self.error(f"Frame nach {cut - len(FRAME_HEADER)} Bytes abgebrochen"))
+                continue
+            if len(self.buffer) < end:
+                break
+            frame = bytes(self.buffer[len(FRAME_HEADER):end])
+            del self.buffer[:end]
+            invalid = sum(1 for char in frame.decode(ENCODING) if char not in VALID_CHARS)
+            events.append(DisplayEvent('frame', self.event_time(), frame,
+                                       f"{invalid} nicht darstellbar" if invalid else ''))
+        return events
+
+    def event_time(self):
+        # The bytes still buffered come after the event on the line
+        return self.wire_free - len(self.buffer) * self.byte_time
+
+    def error(self, detail):
+        return DisplayEvent('error', self.event_time(), None, detail)
+
+
+class DisplayEmulator:
+    """Stand-in for the board on a pseudo-terminal (Linux/macOS).
+
+    open() creates the pty and returns the device to pass as --port.
+    Bytes are taken from the pty no faster than the modelled baud rate.
+    A pty buffers far more than a UART, so a sender is not slowed down
+    at once; `max_backlog_ms` shows how far it ran ahead of the line.
+    Decoded events go to on_event(event) on the thread calling run().
+    """
+
+    def __init__(self, baudrate=BAUDRATE, on_event=None, pace=True):
+        self.decoder = DisplayDecoder(baudrate)
+        self.on_event = on_event
+        self.pace = pace
+        self.master = self.slave = None
+        self.link = None
+        self.running = False
+        self.started = None
+        self.counts = {'frame': 0, 'brightness': 0, 'error': 0, 'invalid_frames': 0}
+        self.bytes_received = 0
+        self.max_backlog = 0.0
+        self.frame_times = deque(maxlen=1000)
+
+    def open(self, link=None):
+        import tty
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # no echo, no newline translation
+        name = os.ttyname(self.slave)
+        if link:
+            if os.path.lexists(link):
+                os.remove(link)
+            os.symlink(name, link)
+            self.link = link
+        return link or name
+
+    def run(self):
+        """Read and decode until stop() is called; blocks the calling thread."""
+        self.running = True
+        self.started = time.perf_counter()
+        while self.running:
+            ready, _, _ = select.select([self.master], [], [], self.decoder.frame_timeout)
+            now = time.perf_counter()
+            data = os.read(self.master, 4096) if ready else b''
+            self.bytes_received += len(data)
+            for event in self.decoder.feed(data, now):
+                self.counts[event.kind] += 1
+                if event.kind == 'frame':
+                    self.frame_times.append(event.time)
+                    if event.detail:
+                        self.counts['invalid_frames'] += 1
+                if self.on_event:
+                    self.on_event(event)
+            self.max_backlog = max(self.max_backlog, self.decoder.backlog)
+            if self.pace and self.decoder.wire_free > now:
+                time.sleep(self.decoder.wire_free - now)
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = None
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        stats = dict(self.counts)
+        stats['bytes'] = self.bytes_received
+        stats['line_busy_percent'] = (self.bytes_received * self.decoder.byte_time / elapsed * 100
+                                      if elapsed else 0.0)
+        stats['max_backlog_ms'] = self.max_backlog * 1000
+        times = list(self.frame_times)
+        if len(times) > 1:
+            stats['fps'] = (len(times) - 1) / (times[-1] - times[0])
+            stats['min_frame_interval_ms'] = min(b - a for a, b in zip(times, times[1:])) * 1000
+        return stats
+
+
+class Inotify:
+    """Minimal ctypes binding to Linux inotify (close-write and rename events)."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path),
+                                    self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch fehlgeschlagen: {path}")
+        self.overflowed = False  # events were lost; the caller must rescan
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith('linux') and hasattr(ctypes.CDLL(None), 'inotify_init1')
+
+    def read(self, timeout):
+        """File names with a finished write or rename; [] after timeout seconds."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = self.EVENT.unpack_from(data, offset)
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """Reports result files in a directory once they are completely written.
+
+    On Linux it waits for inotify close-write and rename events. Elsewhere it
+    polls with os.scandir and a stat cache, so only files whose size or mtime
+    changed are looked at. inotify does not see files written by other
+    clients of a network share, so with inotify the directory is still
+    scanned every `rescan_interval` seconds, and at once if the kernel
+    dropped events. Either way a file is only reported after it has been
+    unchanged for `debounce` seconds, which covers half-written files.
+    """
+
+    def __init__(self, path, callback, suffix='.txt', debounce=0.25, poll_interval=0.5,
+                 use_inotify=None, on_error=None, rescan_interval=5.0):
+        self.path = path
+        self.callback = callback  # called on the watcher thread with the full path
+        self.on_error = on_error
+        self.suffix = suffix
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.use_inotify = Inotify.available() if use_inotify is None else use_inotify
+        self.stat_cache = {}  # name -> (mtime_ns, size)
+        self.pending = {}  # name -> (deadline, (mtime_ns, size))
+        self.running = False
+
+    def stat(self, name):
+        try:
+            st = os.stat(os.path.join(self.path, name))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def prime(self):
+        """Fill the stat cache; returns the newest existing file, if any."""
+        newest = None
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith(self.suffix) and entry.is_file():
+                    st = entry.stat()
+                    self.stat_cache[entry.name] = (st.st_mtime_ns, st.st_size)
+                    if newest is None or st.st_mtime_ns > newest[1]:
+                        newest = (entry.name, st.st_mtime_ns)
+        return newest and newest[0]
+
+    def scan(self):
+        """Polling fallback: names whose stat changed since the last scan."""
+        changed = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                key = (st.st_mtime_ns, st.st_size)
+                if self.stat_cache.get(entry.name) != key:
+                    self.stat_cache[entry.name] = key
+                    changed.append(entry.name)
+        return changed
+
+    def touch(self, name):
+        """(Re)start the quiet period for a file."""
+        self.pending[name] = (time.monotonic() + self.debounce, self.stat(name))
+
+    def flush_pending(self):
+        """Report files that stayed unchanged through their quiet period."""
+        now = time.monotonic()
+        for name, (deadline, key) in list(self.pending.items()):
+            if deadline > now:
+                continue
+            current = self.stat(name)
+            if current is None:
+                del self.pending[name]
+            elif current != key:
+                self.touch(name)  # still being written
+            else:
+                del self.pending[name]
+                self.stat_cache[name] = current
+                self.callback(os.path.join(self.path, name))
+
+    def next_timeout(self):
+        if not self.pending:
+            return self.poll_interval
+        deadline = min(deadline for deadline, _ in self.pending.values())
+        return max(0.0, min(self.poll_interval, deadline - time.monotonic()))
+
+    def run(self, report_newest=True):
+        """Watch until stop() is called; blocks the calling thread."""
+        self.running = True
+        inotify = Inotify(self.path) if self.use_inotify else None
+        try:
+            newest = self.prime()
+            if report_newest and newest:
+                self.callback(os.path.join(self.path, newest))
+            rescan_due = time.monotonic() + self.rescan_interval
+            while self.running:
+                try:
+                    if inotify:
+                        names = inotify.read(self.next_timeout())
+                        if inotify.overflowed or time.monotonic() >= rescan_due:
+                            inotify.overflowed = False
+                            names += self.scan()
+                            rescan_due = time.monotonic() + self.rescan_interval
+                    else:
+                        time.sleep(self.next_timeout())
+                        names = self.scan()
+                    for name in names:
+                        if name.endswith(self.suffix):
+                            self.touch(name)
+                    self.flush_pending()
+                except OSError as e:
+                    # e.g. a network share that is briefly unavailable; keep watching
+                    if self.on_error:
+                        self.on_error(e)
+                    time.sleep(self.poll_interval)
+        finally:
+            if inotify:
+                inotify.close()
+
+    def stop(self):
+        self.running = False
+
+
+RESULT_TITLE = "Sommerregatta 2025"  # replaces the title line of every result file
+TEMPLATES_FILE = "led_templates.json"  # before the template store; migrated once
+TEMPLATE_STORE = "led_templates.jsonl"
+TEMPLATE_SLOTS = 9  # hotkeys F1-F9
+
+ResultRecord = namedtuple('ResultRecord', 'rank lane club time')
+RaceResult = namedtuple('RaceResult', 'title header records extra')
+
+RESULT_LINE = re.compile(
+    r'^\s*(?P<rank>\d+)\.?\s+(?P<lane>\d+)\s+(?P<club>.*?)\s*'
+    r'(?P<time>(?:\d+:)?\d{1,2}[.,]\d{1,2}|DNS|DNF|DSQ|DQ|abg\.?|n\.a\.)?\s*$')
+
+
+def decode_result_bytes(data):
+    """Decode a result file in one pass, detecting the encoding from the bytes."""
+    if data.startswith(b'\xef\xbb\xbf'):
+        return data[3:].decode('utf-8', errors='replace')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    # Not UTF-8: C1 control bytes never occur in Latin-1 text, in cp1252 they are € „ “ ” – …
+    if any(0x80 <= byte <= 0x9F for byte in data):
+        return data.decode('cp1252', errors='replace')
+    return data.decode('iso-8859-1')
+
+
+def parse_result_text(text):
+    """Split a result export into title, race header and typed result records."""
+    lines = [line.rstrip() for line in text.splitlines()]
+    title = lines[0].strip() if lines else ''
+    header = lines[1].strip() if len(lines) > 1 else ''
+    records = []
+    extra = []
+    for line in lines[2:]:
+        if not line.strip():
+            continue
+        match = RESULT_LINE.match(line)
+        if match and match.group('club'):
+            records.append(ResultRecord(int(match.group('rank')), int(match.group('lane')),
+                                        match.group('club'), match.group('time') or ''))
+        else:
+            extra.append(line.strip())
+    return RaceResult(title, header, records, extra)
+
+
+def parse_result_file(filename):
+    with open(filename, 'rb') as file:
+        return parse_result_text(decode_result_bytes(file.read()))
+
+
+def fit_words(text, width):
+    """Cut text to width at a word boundary, dropping dangling separators."""
+    if len(text) <= width:
+        return text
+    words = text.split()
+    fitted = ''
+    for word in words:
+        candidate = f"{fitted} {word}" if fitted else word
+        if len(candidate) > width:
+            break
+        fitted = candidate
+    fitted = fitted.rstrip(' /-,&+')
+    return fitted or text[:width]
+
+
+class ResultLayout:
+    """Formats a RaceResult into display rows of exactly `width` columns.
+
+    Record rows are laid out as rank, lane, club and a right-aligned time;
+    the club is shortened at a word boundary to the space that is left.
+    """
+
+    def __init__(self, title=None, width=NUM_COLS, rank_width=3, lane_width=2, time_width=7):
+        self.title = title  # replaces the title line of the file if set
+        self.width = width
+        self.rank_width = rank_width
+        self.lane_width = lane_width
+        self.time_width = time_width
+
+    def header_rows(self, result):
+        title = self.title if self.title is not None else result.title
+        return [title[:self.width].ljust(self.width), result.header[:self.width].ljust(self.width)]
+
+    def record_row(self, record):
+        prefix = f"{record.rank:<{self.rank_width}}{record.lane:<{self.lane_width}}"
+        time_width = max(self.time_width, len(record.time))
+        club_width = self.width - len(prefix) - time_width - 1
+        club = fit_words(record.club, club_width)
+        return f"{prefix}{club:<{club_width}} {record.time:>{time_width}}"[:self.width]
+
+    def body_rows(self, result):
+        rows = [self.record_row(record) for record in result.records]
+        rows.extend(fit_words(line, self.width).ljust(self.width) for line in result.extra)
+        return rows
+
+    def rows(self, result):
+        return self.header_rows(result) + self.body_rows(result)
+
+
+class ResultPages:
+    """A race result prerendered into one display message per page.
+
+    The title and race header rows stay on every page; the boats are split
+    over as many pages as needed. With more than one page the last four
+    columns of the header row show the page number. Text is transcoded
+    before the layout, so fallback spellings cannot push the time out.
+    """
+
+    def __init__(self, result, layout, transcoder=None):
+        transcoder = transcoder or DEFAULT_TRANSCODER
+        texts = transcoder.sanitize_lines([result.title, result.header]
+                                          + [record.club for record in result.records] + result.extra)
+        clubs = texts[2:2 + len(result.records)]
+        result = RaceResult(texts[0], texts[1],
+                            [record._replace(club=club) for record, club in zip(result.records, clubs)],
+                            texts[2 + len(result.records):])
+        self.result = result
+        header = layout.header_rows(result)
+        body = layout.body_rows(result)
+        per_page = NUM_ROWS - len(header)
+        chunks = [body[i:i + per_page] for i in range(0, len(body), per_page)] or [[]]
+        self.frames = []
+        for number, chunk in enumerate(chunks, 1):
+            rows = list(header)
+            if len(chunks) > 1:
+                rows[-1] = rows[-1][:NUM_COLS - 4] + f"{number}/{len(chunks)}".rjust(4)
+            self.frames.append(transcoder.encode_frame(rows + chunk))
+        self.messages = [build_message(frame) for frame in self.frames]
+
+    def __len__(self):
+        return len(self.frames)
+
+
+RESULT_FILENAME = re.compile(
+    r'(?:^|_)R(?P<race>\d+)'    # race number, e.g. R900 or a leading R012
+    r'(?:-[^_]*)?'              # optional day/session code, e.g. -SON
+    r'.*?'
+    r'(?:_v(?P<major>\d+)(?:_(?P<minor>\d+))?)?'  # version, e.g. v2_0
+    r'\.txt$', re.IGNORECASE)
+
+ResultFile = namedtuple('ResultFile', 'race version path stat content trace')
+
+
+def parse_result_filename(name):
+    """(race, version) from a result file name; unknown names are their own race."""
+    match = RESULT_FILENAME.search(name)
+    if not match:
+        return name, (0, 0)
+    version = (int(match.group('major') or 0), int(match.group('minor') or 0))
+    return int(match.group('race')), version
+
+
+class ResultRotation:
+    """Decides which result page belongs on the board, independent of Tk.
+
+    Races are taken from the catalog queue in order, and pages of the
+    current result rotate every `page_interval` seconds. A race shown while
+    others are waiting stays up for at least `dwell` seconds and one full
+    turn through its pages; one shown on an empty queue is preempted as
+    soon as the next file arrives. poll() returns (pages, index) whenever
+    the board should change.
+    """
+
+    def __init__(self, catalog, dwell=8.0, page_interval=4.0):
+        self.catalog = catalog
+        self.dwell = dwell
+        self.page_interval = page_interval
+        self.entry = None  # ResultFile on the board; None for a manually loaded result
+        self.pages = None
+        self.page_index = 0
+        self.page_due = None
+        self.dwell_until = 0.0
+
+    def show(self, pages, entry=None, now=None):
+        """Put a result on the board right away, preempting the current one."""
+        now = time.monotonic() if now is None else now
+        self.pages = pages
+        self.entry = entry
+        self.page_index = 0
+        self.page_due = now + self.page_interval if len(pages) > 1 else None
+        if entry and self.catalog.pending():
+            self.dwell_until = now + max(self.dwell, len(pages) * self.page_interval)
+        else:
+            self.dwell_until = now
+        return pages, 0
+
+    def stop(self):
+        self.pages = None
+        self.entry = None
+        self.page_due = None
+
+    def poll(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now >= self.dwell_until:
+            entry = self.catalog.next()
+            if entry:
+                entry.trace.setdefault('dequeued', time.time())
+                return self.show(entry.content, entry, now)
+        if self.page_due is not None and now >= self.page_due:
+            self.page_index = (self.page_index + 1) % len(self.pages)
+            self.page_due = now + self.page_interval
+            return self.pages, self.page_index
+        return None
+
+    def next_poll(self, now=None):
+        """Seconds until poll() may have something to show; None to wait for new files."""
+        now = time.monotonic() if now is None else now
+        deadlines = [self.page_due] if self.page_due is not None else []
+        if self.catalog.pending():
+            deadlines.append(self.dwell_until)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+
+class ResultCatalog:
+    """Incremental index of result files, keyed by race number.
+
+    A file is only re-read when its (mtime, size) changed. Each race keeps
+    its highest version, so a late v1 never replaces a v2 correction. Races
+    that received a new or corrected result wait in `queue` in arrival
+    order; a correction for a race still waiting keeps its place.
+    """
+
+    def __init__(self, parse=parse_result_file):
+        self.parse = parse
+        self.races = {}  # race -> ResultFile
+        self.stats = {}  # path -> (mtime_ns, size) last parsed
+        self.queue = deque()  # races waiting to be shown
+        self.lock = Lock()
+
+    def update(self, path):
+        """Index a new or changed file; returns True if its race was queued."""
+        detected = time.time()
+        st = os.stat(path)
+        stat = (st.st_mtime_ns, st.st_size)
+        race, version = parse_result_filename(os.path.basename(path))
+        with self.lock:
+            if self.stats.get(path) == stat:
+                return False
+            current = self.races.get(race)
+            if current and current.version > version:
+                self.stats[path] = stat
+                return False  # superseded by a newer version
+        content = self.parse(path)  # outside the lock, may take a while
+        if content is None:
+            return False
+        trace = {'mtime': st.st_mtime_ns / 1e9, 'detected': detected, 'parsed': time.time()}
+        with self.lock:
+            self.stats[path] = stat
+            current = self.races.get(race)
+            if current and current.version > version:
+                return False
+            self.races[race] = ResultFile(race, version, path, stat, content, trace)
+            if race not in self.queue:
+                self.queue.append(race)
+            return True
+
+    def next(self):
+        """The oldest queued race in its newest version, or None."""
+        with self.lock:
+            if not self.queue:
+                return None
+            return self.races[self.queue.popleft()]
+
+    def pending(self):
+        with self.lock:
+            return len(self.queue)
+
+    def drop_queued(self):
+        """Forget the races still waiting; they stay indexed, so unchanged files are not queued again."""
+        with self.lock:
+            self.queue.clear()
+
+
+class TemplateStore:
+    """Saved templates in an append-only JSON-lines journal.
+
+    Each save, delete or hotkey assignment appends one line with fsync,
+    so a crash costs at most that line. Once most lines are superseded
+    the journal is rewritten into a temporary file and swapped in with
+    os.replace. Without a journal the old led_templates.json next to it
+    is migrated. Names are kept sorted for prefix lookup, and each
+    template is kept as a ready-to-send display message. refresh() picks
+    up lines appended by another process, e.g. the GUI beside the daemon.
+    """
+
+    def __init__(self, path=TEMPLATE_STORE, transcoder=None, legacy_path=None):
+        self.path = path
+        self.transcoder = transcoder or DEFAULT_TRANSCODER
+        self.lock = Lock()
+        self.reset()
+        self.identity = None  # (st_dev, st_ino) of the journal read so far
+        if legacy_path is None:
+            legacy_path = os.path.join(os.path.dirname(path), TEMPLATES_FILE)
+        if not os.path.exists(path) and os.path.exists(legacy_path):
+            self.migrate(legacy_path)
+        self.refresh()
+
+    def reset(self):
+        self.templates = {}  # name -> rows
+        self.messages = {}  # name -> display message
+        self.sorted_names = []
+        self.slots = {}  # hotkey number -> name
+        self.records = 0  # journal lines read
+        self.skipped = 0  # journal lines that could not be used
+        self.offset = 0
+
+    def migrate(self, legacy_path):
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            templates = json.load(f)
+        if not isinstance(templates, dict):
+            raise ValueError(f"{legacy_path}: JSON-Objekt erwartet")
+        for name, rows in templates.items():
+            self.apply({'name': name, 'rows': rows})
+        self.compact()
+
+    def refresh(self):
+        """Apply lines appended since the last read; reload after a compaction. True if anything changed."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            identity = (st.st_dev, st.st_ino)
+            if identity != self.identity or st.st_size < self.offset:
+                self.reset()
+                self.identity = identity
+            if st.st_size == self.offset:
+                return False
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+            end = data.rfind(b'\n') + 1  # an unfinished last line waits for its writer
+            for line in data[:end].splitlines():
+                try:
+                    self.apply(json.loads(line))
+                except (ValueError, TypeError, KeyError):
+                    self.skipped += 1
+            self.offset += end
+            return end > 0
+
+    def apply(self, record):
+        if not isinstance(record, dict):
+            raise ValueError("JSON-Objekt erwartet")
+        if 'slot' in record:
+            slot = int(record['slot'])
+            if record['name'] is None:
+                self.slots.pop(slot, None)
+            else:
+                self.slots[slot] = str(record['name'])
+        elif record.get('deleted'):
+            name = record['name']
+            if self.templates.pop(name, None) is not None:
+                del self.messages[name]
+                del self.sorted_names[bisect.bisect_left(self.sorted_names, name)]
+        else:
+            name, rows = str(record['name']), record['rows']
+            if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+                raise ValueError("rows muss eine Liste von Zeilen sein")
+            if name not in self.templates:
+                bisect.insort(self.sorted_names, name)
+            self.templates[name] = rows
+            self.messages[name] = build_message(self.transcoder.encode_frame(rows))
+        self.records += 1
+
+    def append(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.path, 'a+b') as f:
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line  # a torn line from a crash stays on its own
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.refresh()
+        if self.records > 2 * (len(self.templates) + len(self.slots)) + 64:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only the live lines, atomically."""
+        with self.lock:
+            records = [{'name': name, 'rows': self.templates[name]} for name in self.sorted_names]
+            records += [{'slot': slot, 'name': name} for slot, name in sorted(self.slots.items())]
+        # A temporary file of its own, so two processes compacting at once cannot mix their output
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(self.path)),
+                                         prefix=os.path.basename(self.path) + '.', suffix='.tmp',
+                                         delete=False) as f:
+            try:
+                for record in records:
+                    f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                if os.path.exists(self.path):
+                    os.chmod(f.name, os.stat(self.path).st_mode & 0o777)  # not the 0600 of temp files
+            except OSError:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, self.path)
+        self.identity = None
+        self.refresh()
+
+    def put(self, name, rows):
+        """Save or replace a template; raises OSError if the journal cannot be written."""
+        self.append({'name': name, 'rows': list(rows)})
+
+    def delete(self, name):
+        if name in self.templates:
+            self.append({'name': name, 'deleted': True})
+
+    def assign(self, slot, name):
+        """Put a template on hotkey slot 1-9; name None clears the slot."""
+        if not 1 <= slot <= TEMPLATE_SLOTS:
+            raise ValueError(f"Taste 1-{TEMPLATE_SLOTS} erwartet, nicht {slot}")
+        self.append({'slot': slot, 'name': name})
+
+    def slot(self, slot):
+        return self.slots.get(slot)
+
+    def __len__(self):
+        return len(self.templates)
+
+    def __contains__(self, name):
+        return name in self.templates
+
+    def get(self, name, default=None):
+        return self.templates.get(name, default)
+
+    def names(self, prefix=''):
+        """Sorted names starting with prefix."""
+        with self.lock:
+            start = bisect.bisect_left(self.sorted_names, prefix)
+            end = bisect.bisect_left(self.sorted_names, prefix + '\U0010ffff') if prefix else len(self.sorted_names)
+            return self.sorted_names[start:end]
+
+    def find(self, prefix):
+        """The exact name, or the only name starting with prefix; None otherwise."""
+        if prefix in self.templates:
+            return prefix
+        matches = self.names(prefix)
+        return matches[0] if len(matches) == 1 else None
+
+    def message(self, name):
+        """Ready-to-send display message, None for an unknown name."""
+        return self.messages.get(name)
+
+    def frame(self, name):
+        message = self.messages.get(name)
+        return None if message is None else memoryview(message)[len(FRAME_HEADER):]
+
+
+PLAYLIST_FILE = "regatta_playlist.json"
+PLAYLIST_DURATION = 10.0  # seconds for a still frame without "duration"
+PLAYLIST_RESULT_HOLD = 30.0  # seconds a fresh result keeps the playlist off the board
+
+PlaylistItem = namedtuple('PlaylistItem', 'name animation duration source priority at')
+
+
+def parse_playlist_time(text):
+    """"HH:MM" (daily) or ":MM" (every hour) into (hour or None, minute)."""
+    hour, sep, minute = str(text).partition(':')
+    try:
+        if not sep:
+            raise ValueError
+        hour = int(hour) if hour.strip() else None
+        minute = int(minute)
+        if not 0 <= minute < 60 or (hour is not None and not 0 <= hour < 24):
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Zeit als HH:MM oder :MM erwartet, nicht {text!r}") from None
+    return hour, minute
+
+
+def next_occurrence(at, wall):
+    """Wall-clock time of the next (hour, minute) after wall; hour None means every hour."""
+    hour, minute = at
+    current = datetime.fromtimestamp(wall).replace(second=0, microsecond=0)
+    if hour is None:
+        candidate, step = current.replace(minute=minute), timedelta(hours=1)
+    else:
+        candidate, step = current.replace(hour=hour, minute=minute), timedelta(days=1)
+    while candidate.timestamp() <= wall:
+        candidate += step
+    return candidate.timestamp()
+
+
+class PlaylistSlot:
+    """Playback position of an item, on the board or suspended below another one."""
+
+    def __init__(self, item, now):
+        self.item = item
+        self.index = 0
+        self.loop = 0
+        self.interval = 1 / min(item.animation.fps, max_frame_rate())
+        self.frame_due = now + self.interval if len(item.animation) > 1 else None
+        self.ends = now + item.duration
+        self.finished = False
+        self.suspended_at = None
+
+    def advance(self, now):
+        # Frames missed while we were late are dropped, as in animation playback
+        count = 1 + int((now - self.frame_due) / self.interval)
+        self.index, self.loop, playing = advance_position(self.item.animation, self.index, self.loop, count)
+        self.frame_due += count * self.interval
+        self.finished = not playing
+
+    def suspend(self, now):
+        if self.suspended_at is None:
+            self.suspended_at = now
+
+    def resume(self, now):
+        """Continue with the same frame and the rest of the time."""
+        shift = now - self.suspended_at
+        if self.frame_due is not None:
+            self.frame_due += shift
+        self.ends += shift
+        self.suspended_at = None
+
+    def done(self, now):
+        return self.finished or now >= self.ends
+
+    def message(self):
+        return self.item.animation.message(self.index)
+
+
+class Playlist:
+    """Decides which playlist item belongs on the board, independent of Tk.
+
+    Rotation items take turns, each for its duration. A timed item
+    preempts everything of lower or equal priority when its time comes;
+    the preempted item is suspended and later resumes with the same frame
+    and the rest of its time. preempt() holds the whole playlist while a
+    fresh result is on the board. Items are compiled animations, so
+    playback only hands out ready-to-send messages. poll() returns
+    (item, message) whenever the board should change.
+    """
+
+    def __init__(self, rotation, timed=(), result_hold=PLAYLIST_RESULT_HOLD, now=None, wall=None):
+        now = time.monotonic() if now is None else now
+        wall = time.time() if wall is None else wall
+        self.rotation = list(rotation)
+        self.position = 0
+        self.timed = [[item, now + next_occurrence(item.at, wall) - wall] for item in timed]
+        self.result_hold = result_hold
+        self.stack = []  # PlaylistSlot; the last one is on the board
+        self.hold_until = None
+        self.changed = True
+
+    def push(self, slot, now):
+        position = len(self.stack)
+        while position and self.stack[position - 1].item.priority > slot.item.priority:
+            position -= 1
+        if position == len(self.stack):
+            if self.stack:
+                self.stack[-1].suspend(now)
+            self.changed = True
+        else:
+            slot.suspend(now)  # waits below a higher priority item
+        self.stack.insert(position, slot)
+
+    def preempt(self, duration=0.0, now=None):
+        """Keep the playlist off the board for result_hold seconds, or duration if longer."""
+        now = time.monotonic() if now is None else now
+        until = now + max(self.result_hold, duration)
+        if self.stack:
+            self.stack[-1].suspend(now)
+        self.hold_until = max(until, self.hold_until or until)
+
+    def held(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self.hold_until is not None and now < self.hold_until
+
+    def current(self):
+        return self.stack[-1].item if self.stack else None
+
+    def poll(self, now=None, wall=None):
+        now = time.monotonic() if now is None else now
+        if self.hold_until is not None:
+            if now < self.hold_until:
+                return None
+            self.hold_until = None
+            self.changed = True  # the result has overwritten the board
+        wall = time.time() if wall is None else wall
+        for entry in self.timed:
+            item, due = entry
+            if now >= due:
+                # A minute ahead, so a slightly early wake-up never fires twice
+                entry[1] = now + next_occurrence(item.at, wall + 60) - wall
+                self.push(PlaylistSlot(item, now), now)
+        if self.stack:
+            top = self.stack[-1]
+            if top.suspended_at is not None:
+                top.resume(now)
+            elif top.frame_due is not None and now >= top.frame_due:
+                index = top.index
+                top.advance(now)
+                self.changed = self.changed or top.index != index
+        while self.stack and self.stack[-1].done(now):
+            self.stack.pop()
+            self.changed = True
+            if self.stack:
+                self.stack[-1].resume(now)
+        if not self.stack and self.rotation:
+            self.stack.append(PlaylistSlot(self.rotation[self.position], now))
+            self.position = (self.position + 1) % len(self.rotation)
+            self.changed = True
+        if not self.stack or not self.changed:
+            return None
+        self.changed = False
+        top = self.stack[-1]
+        return top.item, top.message()
+
+    def next_poll(self, now=None):
+        """Seconds until poll() may have something to show; None if nothing is scheduled."""
+        now = time.monotonic() if now is None else now
+        if self.hold_until is not None:
+            return max(0.0, self.hold_until - now)
+        deadlines = [due for _, due in self.timed]
+        if self.stack:
+            top = self.stack[-1]
+            deadlines.append(top.ends)
+            if top.frame_due is not None:
+                deadlines.append(top.frame_due)
+        elif self.rotation:
+            deadlines.append(now)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+
+def compile_playlist_item(spec, templates, transcoder, base_dir, priority=0):
+    if not isinstance(spec, dict):
+        raise ValueError(f"Eintrag muss ein Objekt sein: {spec!r}")
+    if 'ticker' in spec:
+        rows = templates.get(spec['template']) if 'template' in spec else spec.get('rows', [])
+        if rows is None:
+            raise ValueError(f"Unbekannte Vorlage: {spec['template']}")
+        animation = Ticker({int(spec.get('row', NUM_ROWS)) - 1: str(spec['ticker'])},
+                           transcoder.encode_frame(rows), fps=spec.get('fps', TICKER_FPS),
+                           transcoder=transcoder)
+        name, source = str(spec['ticker'])[:NUM_COLS], 'animation'
+    elif 'animation' in spec:
+        path = os.path.join(base_dir, spec['animation'])
+        with open(path, 'r', encoding='utf-8') as f:
+            animation = parse_animation(f.read(), transcoder)
+        if not animation:
+            raise ValueError(f"Keine Frames in {spec['animation']}")
+        name, source = os.path.basename(path), 'animation'
+    elif 'template' in spec or 'rows' in spec:
+        rows = templates.get(spec['template']) if 'template' in spec else spec['rows']
+        if rows is None:
+            raise ValueError(f"Unbekannte Vorlage: {spec['template']}")
+        animation = CompiledAnimation()
+        animation.add_frame(transcoder.encode_frame(rows))
+        name, source = spec.get('template', 'Text'), 'template'
+    else:
+        raise ValueError(f"animation, ticker, template oder rows erwartet: {spec!r}")
+    duration = spec.get('duration')
+    if duration is None:
+        # One pass (or all #LOOPS) of an animation, a fixed time for a still frame
+        interval = 1 / min(animation.fps, max_frame_rate())
+        duration = len(animation) * (animation.loops or 1) * interval if len(animation) > 1 else PLAYLIST_DURATION
+    at = parse_playlist_time(spec['at']) if 'at' in spec else None
+    return PlaylistItem(spec.get('name', name), animation, float(duration), source,
+                        int(spec.get('priority', priority)), at)
+
+
+def load_playlist(path, templates, transcoder=None):
+    """Compile a playlist file into a Playlist; raises OSError or ValueError.
+
+    {"items": [...], "timed": [...], "result_hold": 30}; every entry is
+    {"animation": FILE}, {"template": NAME}, {"rows": [...]} or
+    {"ticker": TEXT, "row": 1-8, "fps": N} over an optional template or
+    rows, each with optional "duration" in seconds and "priority". Timed entries also
+    need "at": "HH:MM" for once a day or ":MM" for every hour. Animation
+    paths are relative to the playlist file.
+    """
+    transcoder = transcoder or DEFAULT_TRANSCODER
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError("Playlist muss ein JSON-Objekt sein")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    rotation = [compile_playlist_item(item, templates, transcoder, base_dir) for item in spec.get('items', [])]
+    timed = [compile_playlist_item(item, templates, transcoder, base_dir, priority=1)
+             for item in spec.get('timed', [])]
+    if any(item.at is None for item in timed):
+        raise ValueError("Zeitgesteuerte Einträge brauchen \"at\"")
+    if not rotation and not timed:
+        raise ValueError("Playlist ist leer")
+    return Playlist(rotation, timed, float(spec.get('result_hold', PLAYLIST_RESULT_HOLD)))
+
+
+# Wall-clock stamps of a result update, in pipeline order: file written,
+# noticed by the auto-scan (or opened by hand), parsed and laid out, taken
+# from the queue, drawn in the grid, and on the wire
+TRACE_STAGES = ('mtime', 'detected', 'parsed', 'dequeued', 'rendered', 'written')
+LATENCY_LOG = "regatta_latency.jsonl"
+
+
+class LatencyTracker:
+    """End-to-end timing of result updates, from file mtime to bytes on the wire.
+
+    A trace is a dict of TRACE_STAGES times filled in along the pipeline;
+    stages that do not apply are left out. finish() stamps 'written',
+    keeps the time spent in each stage for rolling p50/p95/p99 figures and
+    appends one JSON line per update to the log.
+    """
+
+    def __init__(self, log_path=LATENCY_LOG, window=500, on_record=None):
+        self.log_path = log_path
+        self.on_record = on_record  # called on the writer thread with every finished record
+        self.stages = {stage: deque(maxlen=window) for stage in TRACE_STAGES[1:] + ('total',)}
+        self.lock = Lock()
+
+    def on_written(self, trace, **info):
+        """SerialWriter callback that finishes the trace."""
+        return lambda finished: self.finish(trace, **info)
+
+    def finish(self, trace, **info):
+        trace['written'] = time.time()
+        stamps = [(stage, trace[stage]) for stage in TRACE_STAGES if stage in trace]
+        record = {'time': datetime.fromtimestamp(trace['written']).isoformat(timespec='milliseconds')}
+        record.update(info)
+        record['from'] = stamps[0][0]
+        record['stages_ms'] = {stage: round((stamp - previous) * 1000, 2)
+                               for (_, previous), (stage, stamp) in zip(stamps, stamps[1:])}
+        record['total_ms'] = round((stamps[-1][1] - stamps[0][1]) * 1000, 2)
+        self.add(record)
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass  # a full disk must not stop the board
+        if self.on_record:
+            self.on_record(record)
+        return record
+
+    def add(self, record):
+        with self.lock:
+            for stage, milliseconds in record['stages_ms'].items():
+                self.stages[stage].append(milliseconds)
+            self.stages['total'].append(record['total_ms'])
+
+    def stats(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms}} for every stage seen so far."""
+        with self.lock:
+            figures = {stage: sorted(values) for stage, values in self.stages.items() if values}
+        return {stage: {'count': len(values), 'p50_ms': percentile(values, 50),
+                        'p95_ms': percentile(values, 95), 'p99_ms': percentile(values, 99)}
+                for stage, values in figures.items()}
+
+    def report(self):
+        lines = [f"{'':<10}{'Anzahl':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for stage, figures in self.stats().items():
+            lines.append(f"{stage:<10}{figures['count']:>7}{figures['p50_ms']:>10.1f}"
+                         f"{figures['p95_ms']:>10.1f}{figures['p99_ms']:>10.1f}")
+        return "\n".join(lines)
+
+
+PUSH_PORT = 7300  # TCP and UDP; HTTP listens on the next port
+PUSH_MAX_REQUEST = 1024 * 1024
+
+
+class PushServer:
+    """Local push input for the timing system: TCP, UDP and HTTP on one asyncio thread.
+
+    A request is a JSON object with one of
+        {"frame": "<240 bytes, base64>"}    {"rows": ["...", ...]}
+        {"template": "<name>"}              {"result": "<text of a result file>"}
+    or {"stats": true}; "board": "<name>" (or a list of names) sends the
+    frame to those boards only. TCP takes one object per line and answers each
+    with a JSON line, UDP one object per datagram without answer. HTTP
+    takes POST /push with a JSON body, POST /frame with the raw 240 bytes,
+    POST /result with a raw result file, and GET /stats.
+
+    The first message goes straight to the SerialWriter, which coalesces
+    bursts (latest frame wins). While the link is saturated TCP
+    connections stop reading, so senders see backpressure through their
+    socket, and HTTP answers only once there is room again. Afterwards
+    on_push(kind, content) is called on the server thread with the frame
+    bytes or the ResultPages, so the caller can mirror the board.
+    """
+
+    def __init__(self, writer, host='127.0.0.1', port=PUSH_PORT, http_port=None, layout=None,
+                 transcoder=None, templates=None, on_push=None):
+        self.writer = writer
+        self.host = host
+        self.port = port
+        self.http_port = port + 1 if http_port is None else http_port
+        self.layout = layout or ResultLayout(title=RESULT_TITLE)
+        self.transcoder = transcoder or DEFAULT_TRANSCODER
+        self.templates = templates  # returns the TemplateStore
+        self.on_push = on_push
+        self.counts = {'tcp': 0, 'udp': 0, 'http': 0, 'rejected': 0}
+        self.latencies = deque(maxlen=1000)  # ingest to wire in seconds, appended by the writer thread
+        self.latency_lock = Lock()
+        self.drain_interval = wire_time(len(FRAME_HEADER) + FRAME_SIZE) / 4
+        self.loop = None
+        self.listeners = []
+        self.thread = None
+
+    def start(self):
+        """Bind all listeners, then serve on a background thread; raises OSError if a port is taken."""
+        import_push()
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.listen())
+        except OSError:
+            self.close_listeners()
+            raise
+        self.thread = Thread(target=self.loop.run_forever, name="push-server", daemon=True)
+        self.thread.start()
+
+    async def listen(self):
+        self.listeners.append(await self.loop.create_server(
+            lambda: PushLineProtocol(self), self.host, self.port))
+        transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: PushDatagramProtocol(self), local_addr=(self.host, self.port))
+        self.listeners.append(transport)
+        self.listeners.append(await asyncio.start_server(self.handle_http, self.host, self.http_port))
+
+    def stop(self):
+        if self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(1.0)
+            self.thread = None
+        if self.loop:
+            self.close_listeners()
+
+    def close_listeners(self):
+        for listener in self.listeners:
+            listener.close()
+        self.listeners = []
+        self.loop.close()
+        self.loop = None
+
+    def saturated(self):
+        """True while a message is already waiting behind the one on the wire."""
+        return self.writer.backlog() > 1
+
+    def when_drained(self, callback):
+        """Call callback on the loop once the link has room again."""
+        if self.saturated():
+            self.loop.call_later(self.drain_interval, self.when_drained, callback)
+        else:
+            callback()
+
+    def handle_request(self, data, via, received):
+        """Decode and push one JSON request; returns the reply object."""
+        self.counts[via] += 1
+        try:
+            request = json.loads(data)
+            if not isinstance(request, dict):
+                raise ValueError("JSON-Objekt erwartet")
+            if request.get('stats'):
+                return self.stats()
+            boards = request.get('board')
+            if isinstance(boards, str):
+                boards = [boards]
+            if boards is not None and not isinstance(self.writer, BoardFanout):
+                raise ValueError("Nur eine Tafel angeschlossen")
+            if 'frame' in request:
+                return self.push('frame', base64.b64decode(request['frame'], validate=True), received, boards)
+            if 'rows' in request:
+                rows = request['rows']
+                if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+                    raise ValueError("rows muss eine Liste von Zeilen sein")
+                return self.push('rows', self.transcoder.encode_frame(rows), received, boards)
+            if 'template' in request:
+                frame = self.templates().frame(request['template']) if self.templates else None
+                if frame is None:
+                    raise ValueError(f"Unbekannte Vorlage: {request['template']}")
+                return self.push('template', frame, received, boards)
+            if 'result' in request:
+                return self.push_result(str(request['result']), received, boards)
+            raise ValueError("frame, rows, template oder result erwartet")
+        except (ValueError, TypeError) as e:  # includes JSON, base64 and Unicode errors
+            self.counts['rejected'] += 1
+            return {'ok': False, 'error': str(e)}
+
+    def push_result(self, text, received, boards=None):
+        pages = ResultPages(parse_result_text(text), self.layout, self.transcoder)
+        return self.push('result', pages, received, boards)
+
+    def push(self, kind, content, received, boards=None):
+        if kind == 'result':
+            message = content.messages[0]
+        elif len(content) != FRAME_SIZE:
+            raise ValueError(f"Frame muss {FRAME_SIZE} Bytes haben, nicht {len(content)}")
+        else:
+            if kind == 'frame':
+                # Raw bytes get the same filter as text, so 0x01 0xFF cannot start a new frame
+                content = bytes(content).translate(self.transcoder.byte_table)
+            message = build_message(content)
+        target = {'boards': boards} if boards is not None else {}
+        self.writer.submit(message, on_written=lambda finished: self.record_latency(finished - received),
+                           source='push', **target)
+        if self.on_push and boards is None:
+            self.on_push(kind, content)
+        return {'ok': True, 'kind': kind, 'pages': len(content) if kind == 'result' else 1}
+
+    def record_latency(self, seconds):
+        with self.latency_lock:
+            self.latencies.append(seconds)
+
+    async def handle_http(self, reader, writer):
+        status, reply = 400, None
+        try:
+            method, path, _ = (await reader.readline()).decode('iso-8859-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('iso-8859-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length > PUSH_MAX_REQUEST:
+                raise ValueError("Anfrage zu groß")
+            body = await reader.readexactly(length)
+            received = time.perf_counter()
+            if method == 'GET' and path == '/stats':
+                status, reply = 200, self.stats()
+            elif method == 'POST' and path in ('/push', '/frame', '/result'):
+                if path == '/push':
+                    reply = self.handle_request(body, 'http', received)
+                else:
+                    self.counts['http'] += 1
+                    try:
+                        if path == '/frame':
+                            reply = self.push('frame', body, received)
+                        else:
+                            reply = self.push_result(decode_result_bytes(body), received)
+                    except ValueError as e:
+                        self.counts['rejected'] += 1
+                        reply = {'ok': False, 'error': str(e)}
+                status = 200 if reply.get('ok', True) else 400
+                while self.saturated():
+                    await asyncio.sleep(self.drain_interval)
+            else:
+                status, reply = 404, {'ok': False, 'error': f"{method} {path} unbekannt"}
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            reply = {'ok': False, 'error': f"Ungültige Anfrage: {e}"}
+        payload = json.dumps(reply).encode()
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    def stats(self):
+        with self.latency_lock:
+            latencies = sorted(self.latencies)
+        stats = dict(self.counts)
+        stats.update(self.writer.stats())
+        if latencies:
+            stats['ingest_to_wire_p50_ms'] = percentile(latencies, 50) * 1000
+            stats['ingest_to_wire_p95_ms'] = percentile(latencies, 95) * 1000
+            stats['ingest_to_wire_max_ms'] = latencies[-1] * 1000
+        return stats
+
+
+class PushLineProtocol:
+    """TCP side of the PushServer: one JSON request per line.
+
+    All complete lines of a chunk are pushed at once, so a burst collapses
+    in the writer; reading pauses while the serial link is saturated.
+    Implements the asyncio.Protocol callbacks without subclassing it, so
+    asyncio is only imported once a server starts.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        received = time.perf_counter()
+        *lines, self.buffer = (self.buffer + data).split(b'\n')
+        replies = [self.server.handle_request(line, 'tcp', received) for line in lines if line.strip()]
+        if len(self.buffer) > PUSH_MAX_REQUEST:
+            replies.append({'ok': False, 'error': "Zeile zu lang"})
+            self.buffer = b''
+        if replies:
+            self.transport.write(b''.join(json.dumps(reply).encode() + b'\n' for reply in replies))
+        if self.server.saturated():
+            self.transport.pause_reading()
+            self.server.when_drained(self.resume)
+
+    def resume(self):
+        if not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def eof_received(self):
+        return None  # close the connection
+
+    def connection_lost(self, exc):
+        pass
+
+    def pause_writing(self):
+        pass
+
+    def resume_writing(self):
+        pass
+
+
+class PushDatagramProtocol:
+    """UDP side of the PushServer: one JSON request per datagram, no answer."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        pass
+
+    def datagram_received(self, data, addr):
+        self.server.handle_request(data, 'udp', time.perf_counter())
+
+    def error_received(self, exc):
+        pass
+
+    def connection_lost(self, exc):
+        pass
+
+
+SETTINGS_FILE = "regatta_settings.json"
+
+
+def load_settings(path=SETTINGS_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_settings(settings, path=SETTINGS_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def make_transcoder(settings, valid_chars=VALID_CHARS, replacement=REPLACEMENT_CHAR):
+    """Transcoder with the "fallback_chars" of the settings file merged into FALLBACK_CHARS."""
+    return Transcoder(valid_chars, replacement, {**FALLBACK_CHARS, **settings.get('fallback_chars', {})})
+
+
+def open_serial(port, baudrate=BAUDRATE):
+    return serial.Serial(
+        port=port, baudrate=baudrate,
+        bytesize=serial.EIGHTBITS,
+        parity=serial.PARITY_NONE,
+        stopbits=serial.STOPBITS_ONE,
+        timeout=1
+    )
+
+
+STALL_LOG = "regatta_stalls.jsonl"
+
+
+class StallWatchdog:
+    """Detects a blocked Tk event loop from the lag of a root.after heartbeat.
+
+    A helper thread notices when the heartbeat is more than `threshold`
+    seconds overdue and captures the main thread's stack at that moment;
+    once the loop runs again the stall is logged as one JSON line and
+    passed to on_stall(record) on the Tk thread.
+    """
+
+    def __init__(self, root, threshold=0.25, interval=0.1, on_stall=None, log_path=STALL_LOG):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.on_stall = on_stall
+        self.log_path = log_path
+        self.thread_id = main_thread().ident
+        self.lock = Lock()
+        self.expected = None  # perf_counter time of the next heartbeat
+        self.current = None  # stall in progress, filled in by the helper thread
+        self.lags = deque(maxlen=600)
+        self.stalls = deque(maxlen=50)
+        self.job = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.expected = time.perf_counter() + self.interval
+        self.job = self.root.after(int(self.interval * 1000), self.beat)
+        Thread(target=self.watch, name="stall-watchdog", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        if self.job:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def beat(self):
+        now = time.perf_counter()
+        with self.lock:
+            lag = now - self.expected
+            stall, self.current = self.current, None
+            self.expected = now + self.interval
+        self.lags.append(lag)
+        self.job = self.root.after(int(self.interval * 1000), self.beat)
+        if stall:
+            self.finish_stall(stall, lag)
+
+    def watch(self):
+        while self.running:
+            time.sleep(self.interval / 2)
+            with self.lock:
+                if self.current or time.perf_counter() - self.expected < self.threshold:
+                    continue
+                frame = sys._current_frames().get(self.thread_id)
+                stack = [f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+                         for entry in traceback.extract_stack(frame)] if frame else []
+                self.current = {'stack': stack}
+
+    def finish_stall(self, stall, lag):
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'duration_ms': round(lag * 1000, 1),
+            'where': stall['stack'][-1] if stall['stack'] else '?',
+            'stack': stall['stack'],
+        }
+        self.stalls.append(record)
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+        if self.on_stall:
+            self.on_stall(record)
+
+    def stats(self):
+        lags = sorted(self.lags)
+        stats = {'stalls': len(self.stalls)}
+        if lags:
+            stats['lag_p50_ms'] = percentile(lags, 50) * 1000
+            stats['lag_p99_ms'] = percentile(lags, 99) * 1000
+            stats['lag_max_ms'] = lags[-1] * 1000
+        return stats
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval into folded stacks.
+
+    write() produces one "outer;...;inner count" line per distinct stack,
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or main_thread().ident
+        self.interval = interval
+        self.samples = Counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = Thread(target=self.run, name="profiler", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame:
+                self.samples[self.fold(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def fold(frame):
+        names = []
+        while frame:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(1.0)
+
+    def write(self, path):
+        """Write the folded stacks; returns the number of samples."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return sum(self.samples.values())
+
 
 class PortSelector:
-    def __init__(self):
+    """Modal port dialog; ports are only enumerated when it is actually needed."""
+
+    def __init__(self, master):
         self.selected_port = None
 
-        dialog = tk.Tk()
+        dialog = tk.Toplevel(master)
         dialog.title("COM Port Auswahl")
 
+        import serial.tools.list_ports
         ports = [p.device for p in serial.tools.list_ports.comports()]
 
         label = tk.Label(dialog, text="Wählen Sie den COM Port:")
@@ -38,26 +2497,309 @@ class PortSelector:
             dialog.destroy()
 
         tk.Button(dialog, text="OK", command=on_select).pack(pady=5)
-        dialog.mainloop()
+        dialog.protocol("WM_DELETE_WINDOW", dialog.destroy)
+        dialog.grab_set()
+        master.wait_window(dialog)
+
+class EntryGrid:
+    """The classic view: one tk.Entry per cell, each with its own key bindings."""
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.entries = [[None for _ in range(NUM_COLS)] for _ in range(NUM_ROWS)]
+        self.shown_frame = bytearray(b' ' * FRAME_SIZE)  # what the entries currently show
+        self.state = 'normal'
+
+        # Create frame for grid with padding
+        grid_frame = tk.Frame(parent, padx=10, pady=10, bg='black')
+        grid_frame.grid(row=0, column=0)
+
+        for row in range(NUM_ROWS):
+            for col in range(NUM_COLS):
+                bg_color = app.defective_color if app.is_defective(row, col) else app.led_off_color
+                entry = tk.Entry(grid_frame, width=2, justify="center",
+                               font=('Courier', 10, 'bold'),
+                               fg=app.text_color,
+                               bg=bg_color,
+                               readonlybackground=bg_color,
+                               insertbackground=app.text_color,
+                               highlightbackground='black',
+                               highlightthickness=1)
+                entry.grid(row=row, column=col, padx=1, pady=1)
+                entry.bind("<KeyRelease>", lambda e, r=row, c=col: self.on_key(e, r, c))
+                entry.bind("<Left>", lambda e, r=row, c=col: self.navigate("left", r, c))
+                entry.bind("<Right>", lambda e, r=row, c=col: self.navigate("right", r, c))
+                entry.bind("<Up>", lambda e, r=row, c=col: self.navigate("up", r, c))
+                entry.bind("<Down>", lambda e, r=row, c=col: self.navigate("down", r, c))
+                entry.bind("<BackSpace>", lambda e, r=row, c=col: self.handle_backspace(e, r, c))
+                entry.bind("<Home>", lambda e, r=row: app.shift_line_left(r))
+                entry.bind("<End>", lambda e, r=row, c=col: app.shift_right_of_cursor_left(r, c))
+                self.entries[row][col] = entry
+
+    def render(self, data):
+        """Redraw only the cells that differ from what is shown."""
+        shown = self.shown_frame
+        if data == shown:
+            return
+        readonly = self.state == 'readonly'
+        for row in range(NUM_ROWS):
+            start = row * NUM_COLS
+            end = start + NUM_COLS
+            if data[start:end] == shown[start:end]:
+                continue
+            for index in range(start, end):
+                if data[index] != shown[index]:
+                    entry = self.entries[row][index - start]
+                    if readonly:
+                        entry.config(state='normal')
+                    entry.delete(0, tk.END)
+                    if data[index] != 0x20:  # blank cells stay empty
+                        entry.insert(0, chr(data[index]))
+                    if readonly:
+                        entry.config(state='readonly')
+        shown[:] = data
+
+    def set_state(self, state):
+        """Switch all entries between 'normal' and 'readonly' if not already there."""
+        if state == self.state:
+            return
+        self.state = state
+        for row in range(NUM_ROWS):
+            for col in range(NUM_COLS):
+                self.entries[row][col].config(state=state)
+
+    def edit_cell(self, row, col, char):
+        """Store a character the user typed; its entry already shows it."""
+        framebuffer = self.app.framebuffer
+        framebuffer.set_cell(row, col, char)
+        index = row * NUM_COLS + col
+        self.shown_frame[index] = framebuffer.data[index]
+
+    def navigate(self, direction, current_row, current_col):
+        next_row, next_col = step_cursor(direction, current_row, current_col)
+        self.entries[next_row][next_col].focus()
+        return "break"  # Prevents default behavior
+
+    def handle_backspace(self, event, row, col):
+        # Clear current cell
+        self.entries[row][col].delete(0, tk.END)
+        self.edit_cell(row, col, ' ')
+        
+        if col > 0:  # Not at start of line
+            prev_col = col - 1
+            self.entries[row][prev_col].focus()
+        elif row > 0:  # At start of line and not first line
+            prev_row = row - 1
+            self.entries[prev_row][NUM_COLS-1].focus()
+        return "break"
+
+    def on_key(self, event, row, col):
+        value = self.entries[row][col].get()
+        
+        # Handle navigation and special keys
+        if event.keysym in ['Left', 'Right', 'Up', 'Down', 'BackSpace']:
+            return
+        if event.keysym == 'Home':
+            self.app.shift_line_left(row)
+            return "break"
+        if event.keysym == 'End':
+            self.app.shift_right_of_cursor_left(row, col)
+            return "break"
+            
+        if value and value[-1] not in self.app.valid_chars:
+            # Replace invalid character with its fallback (one cell: first letter) or ?
+            value = self.app.transcoder.sanitize(value[-1])[:1]
+            self.entries[row][col].delete(0, tk.END)
+            self.entries[row][col].insert(0, value)
+
+        if len(value) > 1:
+            self.entries[row][col].delete(1, tk.END)
+            value = value[:1]
+
+        self.edit_cell(row, col, value or ' ')
+
+        if value:
+            next_row, next_col = row, col + 1
+            if next_col >= NUM_COLS:
+                # Zeile voll → im Framebuffer sind leere Zellen bereits Leerzeichen
+                next_row += 1
+                next_col = 0
+
+            if next_row < NUM_ROWS:
+                self.entries[next_row][next_col].focus()
+
+
+class CanvasGrid:
+    """Alternative view: the whole board on one tk.Canvas, one text item per cell.
+
+    Editing follows the entry grid, but uses a single cursor instead of
+    per-widget focus and a single key binding instead of 1,920.
+    """
+
+    CELL_WIDTH = 22
+    CELL_HEIGHT = 26
+    GAP = 2
+    PADDING = 10
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.shown_frame = bytearray(b' ' * FRAME_SIZE)
+        self.state = 'normal'
+        self.cursor_row = 0
+        self.cursor_col = 0
+
+        pitch_x = self.CELL_WIDTH + self.GAP
+        pitch_y = self.CELL_HEIGHT + self.GAP
+        self.canvas = tk.Canvas(parent, bg='black', highlightthickness=0, takefocus=1,
+                                width=2 * self.PADDING + NUM_COLS * pitch_x,
+                                height=2 * self.PADDING + NUM_ROWS * pitch_y)
+        self.canvas.grid(row=0, column=0)
+
+        self.text_items = []
+        for row in range(NUM_ROWS):
+            for col in range(NUM_COLS):
+                x, y = self.cell_origin(row, col)
+                bg_color = app.defective_color if app.is_defective(row, col) else app.led_off_color
+                self.canvas.create_rectangle(x, y, x + self.CELL_WIDTH, y + self.CELL_HEIGHT,
+                                             fill=bg_color, outline='black')
+                self.text_items.append(self.canvas.create_text(
+                    x + self.CELL_WIDTH // 2, y + self.CELL_HEIGHT // 2, text='',
+                    font=('Courier', 10, 'bold'), fill=app.text_color))
+        self.cursor_item = self.canvas.create_rectangle(0, 0, 0, 0, outline=app.text_color, width=2)
+        self.move_cursor(0, 0)
+
+        self.canvas.bind("<Key>", self.on_key)
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.focus_set()
+
+    def cell_origin(self, row, col):
+        return (self.PADDING + col * (self.CELL_WIDTH + self.GAP),
+                self.PADDING + row * (self.CELL_HEIGHT + self.GAP))
+
+    def render(self, data):
+        """Redraw only the text items whose character changed."""
+        shown = self.shown_frame
+        if data == shown:
+            return
+        itemconfigure = self.canvas.itemconfigure
+        for row in range(NUM_ROWS):
+            start = row * NUM_COLS
+            end = start + NUM_COLS
+            if data[start:end] == shown[start:end]:
+                continue
+            for index in range(start, end):
+                if data[index] != shown[index]:
+                    itemconfigure(self.text_items[index], text=chr(data[index]))
+        shown[:] = data
+
+    def set_state(self, state):
+        self.state = state
+        self.canvas.itemconfigure(self.cursor_item,
+                                  state='hidden' if state == 'readonly' else 'normal')
+
+    def move_cursor(self, row, col):
+        self.cursor_row, self.cursor_col = row, col
+        x, y = self.cell_origin(row, col)
+        self.canvas.coords(self.cursor_item, x, y, x + self.CELL_WIDTH, y + self.CELL_HEIGHT)
+
+    def on_click(self, event):
+        self.canvas.focus_set()
+        col = (event.x - self.PADDING) // (self.CELL_WIDTH + self.GAP)
+        row = (event.y - self.PADDING) // (self.CELL_HEIGHT + self.GAP)
+        if 0 <= row < NUM_ROWS and 0 <= col < NUM_COLS:
+            self.move_cursor(row, col)
+
+    def navigate(self, direction):
+        self.move_cursor(*step_cursor(direction, self.cursor_row, self.cursor_col))
+        return "break"
+
+    def handle_backspace(self):
+        row, col = self.cursor_row, self.cursor_col
+        self.app.framebuffer.set_cell(row, col, ' ')
+        self.app.refresh_grid()
+        if col > 0:  # Not at start of line
+            self.move_cursor(row, col - 1)
+        elif row > 0:  # At start of line and not first line
+            self.move_cursor(row - 1, NUM_COLS - 1)
+        return "break"
+
+    def on_key(self, event):
+        if self.state == 'readonly':
+            return "break"
+        row, col = self.cursor_row, self.cursor_col
+        if event.keysym in ('Left', 'Right', 'Up', 'Down'):
+            return self.navigate(event.keysym.lower())
+        if event.keysym == 'BackSpace':
+            return self.handle_backspace()
+        if event.keysym == 'Home':
+            return self.app.shift_line_left(row)
+        if event.keysym == 'End':
+            return self.app.shift_right_of_cursor_left(row, col)
+
+        char = event.char
+        if not char or not char.isprintable():
+            return
+        if char not in self.app.valid_chars:
+            char = self.app.transcoder.sanitize(char)[:1]
+        self.app.framebuffer.set_cell(row, col, char)
+        self.app.refresh_grid()
+
+        next_row, next_col = row, col + 1
+        if next_col >= NUM_COLS:
+            next_row += 1
+            next_col = 0
+        if next_row < NUM_ROWS:
+            self.move_cursor(next_row, next_col)
+        return "break"
+
+
+def step_cursor(direction, row, col):
+    """Cell reached by one arrow key press, clamped to the board."""
+    if direction == "left":
+        col = max(0, col - 1)
+    elif direction == "right":
+        col = min(NUM_COLS - 1, col + 1)
+    elif direction == "up":
+        row = max(0, row - 1)
+    elif direction == "down":
+        row = min(NUM_ROWS - 1, row + 1)
+    return row, col
+
+
+GRID_VIEWS = {'entry': EntryGrid, 'canvas': CanvasGrid}
+
 
 class LEDMatrixApp:
-    def __init__(self, root, port_selector):
+    def __init__(self, root, port=None, renderer='entry', lamp_test=True, push_port=None, ser=None,
+                 record=True, boards=None):
+        started = time.perf_counter()
+        self.startup_times = {}  # stage -> seconds
         # Auto-scan variables at the start
-        self.auto_scan_active = False
-        self.last_processed_file = None
+        self.watcher = None
         self.watch_path = None
-        self.scan_interval = 15
-        self.templates_file = "led_templates.json"
+        self.result_layout = ResultLayout(title=RESULT_TITLE)
+        # Result pages are rendered on the watcher thread as files arrive
+        self.catalog = ResultCatalog(parse=self.prerender_result_file)
+        self.rotation = ResultRotation(self.catalog)
+        self.rotation_job = None
+        self.latency = None  # LatencyTracker, needs the settings
+        self.templates_file = TEMPLATE_STORE
+        self.templates = None  # TemplateStore, needs the transcoder
 
         # Animation variables
-        self.animation_frames = []
+        self.animation = None  # CompiledAnimation or AnimationFile being played
         self.animation_running = False
-        self.animation_delay = 500  # ms per frame (default)
         self.animation_index = 0
-        self.animation_mode = "LOOP"  # or "ONCE"
+        self.animation_loop = 0
         self.animation_fps = 2  # default FPS
+        self.animation_clock = FrameClock(self.animation_fps)
+        self.animation_job = None
         self.fps_slider = None  # <-- add this line
 
+        # Playlist variables
+        self.playlist = None
+        self.playlist_job = None
+
         # Basic initialization
         self.root = root
         self.root.title("LED-Matrix Editor")
@@ -72,10 +2814,16 @@ class LEDMatrixApp:
         # Create status label early
         self.status_label = tk.Label(root, text="", fg=self.text_color, bg='black')
 
+        # Display content; the grid is only a view of this buffer
+        self.framebuffer = FrameBuffer()
+
         # Create grid and buttons
-        self.entries = [[None for _ in range(NUM_COLS)] for _ in range(NUM_ROWS)]
-        self.create_grid()
-        self.entries[0][0].config(state='normal')
+        self.renderer = renderer
+        self.render_times = deque(maxlen=500)  # seconds per refresh_grid call
+        start = time.perf_counter()
+        self.grid_view = GRID_VIEWS[renderer](self, root)
+        self.grid_build_time = time.perf_counter() - start
+        self.startup_times['Raster'] = self.grid_build_time
 
         # Create buttons
         self.send_button = tk.Button(root, text="An Tafel senden", command=self.send_data)
@@ -88,24 +2836,38 @@ class LEDMatrixApp:
         self.create_menu()
 
         # Mode tracking
-        self.current_mode = "manual"  # modes: manual, race_results
+        self.current_mode = "manual"  # modes: manual, race_results, animation, playlist, initialization
 
-        port = port_selector.selected_port
-        try:
-            self.ser = serial.Serial(
-                port=port, baudrate=38400,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                timeout=1
-            )
-            self.run_initialization_test()
-        except serial.SerialException as e:
-            messagebox.showerror("Serieller Fehler", str(e))
-            self.ser = None
+        self.valid_chars = VALID_CHARS
+        self.replacement_char = REPLACEMENT_CHAR
 
-        self.valid_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789äöüÄÖÜ .,!?|-:+*/\()=#%<>')
-        self.replacement_char = '?'
+        self.ser = None
+        self.writer = None
+        self.send_target = None  # StringVar with the board for "An Tafel senden"
+        self.settings = load_settings()
+        self.boards = self.settings.get('boards', []) if boards is None else boards
+        self.transcoder = make_transcoder(self.settings, self.valid_chars, self.replacement_char)
+        self.latency = LatencyTracker(self.settings.get('latency_log', LATENCY_LOG))
+        self.watchdog = StallWatchdog(root, threshold=self.settings.get('stall_threshold_ms', 250) / 1000,
+                                      on_stall=self.on_stall, log_path=self.settings.get('stall_log', STALL_LOG))
+        self.watchdog.start()
+        self.profiler = None
+        self.recorder = open_session_recorder(self.settings.get('session_log', SESSION_LOG)) if record else None
+        if ser:
+            # Already open, e.g. the FakeSerial of the benchmarks
+            self.ser = ser
+            self.writer = open_writer(ser, self.boards, on_error=self.on_writer_error, recorder=self.recorder)
+        else:
+            self.connect_serial(port or self.settings.get('last_port'))
+        if isinstance(self.writer, BoardFanout):
+            self.create_board_menu()
+        if self.ser and lamp_test and self.settings.get('lamp_test', True):
+            self.run_initialization_test()
+        self.push_server = None
+        self.pushed = None  # latest (kind, content) not yet mirrored in the grid
+        self.push_lock = Lock()
+        if push_port and self.writer:
+            self.start_push_server(push_port)
 
         self.send_button.configure(
             bg=self.led_off_color,
@@ -122,14 +2884,52 @@ class LEDMatrixApp:
         )
 
         # Load saved templates
+        start = time.perf_counter()
         self.load_templates()
+        self.startup_times['Vorlagen'] = time.perf_counter() - start
+        self.startup_times['gesamt'] = time.perf_counter() - started
 
         # Position status label last
         self.status_label.grid(row=NUM_ROWS + 2, column=0, columnspan=NUM_COLS, pady=5)
+        self.root.bind("<Escape>", lambda e: self.skip_initialization_test())
+        self.show_status("Start: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms"
+                                               for stage, seconds in self.startup_times.items()),
+                         duration=8000)
+
+    def connect_serial(self, port):
+        """Open the remembered port directly; enumerate ports only if that fails."""
+        start = time.perf_counter()
+        if port:
+            try:
+                self.ser = open_serial(port)
+            except serial.SerialException:
+                self.ser = None
+        self.startup_times['Port'] = time.perf_counter() - start
+
+        if not self.ser:
+            start = time.perf_counter()
+            port = PortSelector(self.root).selected_port
+            if port:
+                try:
+                    self.ser = open_serial(port)
+                except serial.SerialException as e:
+                    messagebox.showerror("Serieller Fehler", str(e))
+            self.startup_times['Portauswahl'] = time.perf_counter() - start
+
+        if self.ser:
+            self.writer = open_writer(self.ser, self.boards, on_error=self.on_writer_error,
+                                      recorder=self.recorder)
+            if self.settings.get('last_port') != port:
+                self.settings['last_port'] = port
+                try:
+                    save_settings(self.settings)
+                except OSError:
+                    pass  # not remembering the port only costs the fast start
 
     def create_menu(self):
         menubar = tk.Menu(self.root, bg=self.led_off_color, fg=self.text_color)
         self.root.config(menu=menubar)
+        self.menubar = menubar
         
         # File Menu
         file_menu = tk.Menu(menubar, tearoff=0, bg=self.led_off_color, fg=self.text_color,
@@ -137,12 +2937,17 @@ class LEDMatrixApp:
         menubar.add_cascade(label="Datei", menu=file_menu)
         file_menu.add_command(label="Rennergebnisse laden", command=self.load_race_results)
         file_menu.add_command(label="Animation laden", command=self.load_animation)
+        file_menu.add_command(label="Laufschrift", command=self.start_ticker)
         
         # Templates submenu
         templates_menu = tk.Menu(file_menu, tearoff=0, bg=self.led_off_color, fg=self.text_color)
         file_menu.add_cascade(label="Vorlagen", menu=templates_menu)
         templates_menu.add_command(label="Aktuelle Anzeige speichern", command=self.save_template)
         templates_menu.add_command(label="Vorlage laden", command=self.load_template)
+        templates_menu.add_command(label="Vorlage auf Taste legen", command=self.assign_template_slot)
+        templates_menu.add_command(label="Vorlage löschen", command=self.delete_template)
+        for slot in range(1, TEMPLATE_SLOTS + 1):
+            self.root.bind(f"<F{slot}>", lambda e, slot=slot: self.recall_template_slot(slot))
         
         # Auto-scan submenu
         auto_menu = tk.Menu(file_menu, tearoff=0, bg=self.led_off_color, fg=self.text_color)
@@ -150,6 +2955,7 @@ class LEDMatrixApp:
         auto_menu.add_command(label="Verzeichnis wählen", command=self.select_watch_path)
         auto_menu.add_command(label="Start Auto-Scan", command=self.start_auto_scan)
         auto_menu.add_command(label="Stop Auto-Scan", command=self.stop_auto_scan)
+        auto_menu.add_command(label="Seitenwechsel-Intervall", command=self.ask_page_interval)
         
         file_menu.add_separator()
         file_menu.add_command(label="Beenden", command=self.root.quit)
@@ -160,41 +2966,111 @@ class LEDMatrixApp:
         menubar.add_cascade(label="Modus", menu=mode_menu)
         mode_menu.add_command(label="Manueller Modus", command=self.set_manual_mode)
         mode_menu.add_command(label="Rennergebnisse", command=self.set_race_mode)
+        mode_menu.add_command(label="Playlist starten", command=self.load_playlist)
+        mode_menu.add_command(label="Playlist stoppen", command=self.stop_playlist)
+        mode_menu.add_separator()
+        mode_menu.add_command(label="Render-Statistik", command=self.show_render_stats)
+        mode_menu.add_command(label="Sende-Statistik", command=self.show_writer_stats)
+        mode_menu.add_command(label="Push-Statistik", command=self.show_push_stats)
+        mode_menu.add_command(label="Latenz-Statistik", command=self.show_latency_stats)
+        mode_menu.add_command(label="Blockaden", command=self.show_stalls)
+        mode_menu.add_command(label="Profiler starten", command=self.start_profiler)
+        mode_menu.add_command(label="Profiler stoppen", command=self.stop_profiler)
+
+    def create_board_menu(self):
+        # Only with several boards: where "An Tafel senden" goes
+        self.send_target = tk.StringVar(value="")
+        board_menu = tk.Menu(self.menubar, tearoff=0, bg=self.led_off_color, fg=self.text_color,
+                             activebackground=self.led_on_color, activeforeground='black')
+        self.menubar.add_cascade(label="Tafel", menu=board_menu)
+        board_menu.add_radiobutton(label="Alle Tafeln", variable=self.send_target, value="")
+        for board in self.writer.boards:
+            board_menu.add_radiobutton(label=f"{board.name} ({board.port})", variable=self.send_target,
+                                       value=board.name)
 
     def load_templates(self):
-        self.templates = {}
-        if os.path.exists(self.templates_file):
-            try:
-                with open(self.templates_file, 'r') as f:
-                    self.templates = json.load(f)
-            except:
-                pass
+        try:
+            self.templates = TemplateStore(self.templates_file, self.transcoder)
+        except (OSError, ValueError) as e:  # unreadable old led_templates.json
+            self.templates = TemplateStore(self.templates_file, self.transcoder, legacy_path='')
+            self.show_status(f"Alte Vorlagen nicht lesbar: {e}", duration=8000)
 
     def save_template(self):
         name = tk.simpledialog.askstring("Speichern", "Name der Vorlage:")
         if name:
-            content = []
-            for row in range(NUM_ROWS):
-                line = ''.join(self.entries[row][col].get() or ' ' for col in range(NUM_COLS))
-                content.append(line)
-            self.templates[name] = content
-            with open(self.templates_file, 'w') as f:
-                json.dump(self.templates, f)
+            try:
+                self.templates.put(name, self.framebuffer.rows())
+            except OSError as e:
+                messagebox.showerror("Vorlagen", f"Speichern fehlgeschlagen: {e}")
 
-    def load_template(self):
-        if not self.templates:
+    def ask_template(self, title):
+        """Ask for a template name; a unique prefix is enough."""
+        if not len(self.templates):
             messagebox.showinfo("Info", "Keine Vorlagen verfügbar")
+            return None
+        prefix = tk.simpledialog.askstring(title, "Name der Vorlage (Anfang genügt):",
+                                           initialvalue=self.templates.names()[0])
+        if not prefix:
+            return None
+        name = self.templates.find(prefix)
+        if name is None:
+            matches = self.templates.names(prefix)
+            self.show_status(f"Mehrdeutig: {', '.join(matches[:5])}" + (" …" if len(matches) > 5 else "")
+                             if matches else f"Keine Vorlage beginnt mit {prefix!r}")
+        return name
+
+    def load_template(self):
+        name = self.ask_template("Laden")
+        if name:
+            self.show_template(name)
+
+    def show_template(self, name):
+        """Show a saved template; its message is prebuilt, so this is one serial write."""
+        self.stop_page_rotation()
+        self.framebuffer.set_frame(self.templates.frame(name))
+        self.refresh_grid()
+        if self.ser:
+            self.send_message(self.templates.message(name), source='template')
+        self.show_status(f"Vorlage {name}")
+
+    def recall_template_slot(self, slot):
+        name = self.templates.slot(slot) if self.templates else None
+        if name in self.templates:
+            self.show_template(name)
+        else:
+            self.show_status(f"F{slot} ist nicht belegt")
+
+    def assign_template_slot(self):
+        name = self.ask_template("Taste belegen")
+        if not name:
             return
-        
-        name = tk.simpledialog.askstring("Laden", "Name der Vorlage:",
-                                       initialvalue=list(self.templates.keys())[0])
-        if name and name in self.templates:
-            self.clear_grid()
-            content = self.templates[name]
-            for row, line in enumerate(content):
-                for col, char in enumerate(line):
-                    self.entries[row][col].insert(0, char)
-            self.send_data()
+        slot = simpledialog.askinteger("Taste belegen", f"Taste F1-F{TEMPLATE_SLOTS} für {name}:",
+                                       minvalue=1, maxvalue=TEMPLATE_SLOTS)
+        if slot:
+            try:
+                self.templates.assign(slot, name)
+            except OSError as e:
+                messagebox.showerror("Vorlagen", f"Speichern fehlgeschlagen: {e}")
+                return
+            self.show_status(f"F{slot}: {name}")
+
+    def delete_template(self):
+        name = self.ask_template("Löschen")
+        if name and messagebox.askyesno("Löschen", f"Vorlage {name} löschen?"):
+            try:
+                self.templates.delete(name)
+            except OSError as e:
+                messagebox.showerror("Vorlagen", f"Löschen fehlgeschlagen: {e}")
+
+    def show_render_stats(self):
+        times = sorted(self.render_times)
+        if not times:
+            self.show_status("Noch keine Render-Durchläufe")
+            return
+        mean = sum(times) / len(times)
+        self.show_status(f"Raster '{self.renderer}': Aufbau {self.grid_build_time * 1000:.1f} ms, "
+                         f"Frame Ø {mean * 1000:.2f} ms / max {times[-1] * 1000:.2f} ms "
+                         f"({len(times)} Frames)", duration=8000)
 
     def select_watch_path(self):
         path = filedialog.askdirectory(title="Verzeichnis für Auto-Scan wählen")
@@ -212,42 +3088,77 @@ class LEDMatrixApp:
             messagebox.showerror("Fehler", "Bitte zuerst ein Verzeichnis wählen")
             return
         
-        self.auto_scan_active = True
-        self.last_processed_file = None
-        self.last_modified_time = 0
-        Thread(target=self.auto_scan_thread, daemon=True).start()
-        self.show_status(f"Auto-Scan aktiv: {self.watch_path}")
+        if self.watcher:
+            self.watcher.stop()
+        self.watcher = DirectoryWatcher(
+            self.watch_path, self.on_result_file,
+            on_error=lambda e: self.root.after(0, self.show_status, f"Scan-Fehler: {str(e)}"))
+        Thread(target=self.auto_scan_thread, args=(self.watcher,), daemon=True).start()
+        method = "inotify" if self.watcher.use_inotify else "scandir"
+        self.show_status(f"Auto-Scan aktiv ({method}): {self.watch_path}")
 
     def stop_auto_scan(self):
-        self.auto_scan_active = False
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        # Races already queued must not keep coming up after Stop
+        self.catalog.drop_queued()
+        if self.rotation_job:
+            self.root.after_cancel(self.rotation_job)
+            self.rotation_job = None
         self.show_status("Auto-Scan gestoppt")
 
-    def auto_scan_thread(self):
-        while self.auto_scan_active:
-            try:
-                files = [(f, os.path.getmtime(os.path.join(self.watch_path, f))) 
-                        for f in os.listdir(self.watch_path) 
-                        if f.endswith('.txt')]
-                
-                if files:
-                    newest_file, mod_time = max(files, key=lambda x: x[1])
-                    full_path = os.path.join(self.watch_path, newest_file)
-                    
-                    if mod_time > self.last_modified_time + 0.1:
-                        self.last_modified_time = mod_time
-                        time.sleep(0.5)
-                        self.root.after(0, self._safe_load_file, full_path)
-            except Exception as e:
-                self.show_status(f"Scan-Fehler: {str(e)}")
-            
-            time.sleep(1)
+    def auto_scan_thread(self, watcher):
+        try:
+            watcher.run()
+        except Exception as e:
+            self.root.after(0, self.show_status, f"Scan-Fehler: {str(e)}")
 
-    def _safe_load_file(self, filepath):
+    def on_result_file(self, path):
+        # Called on the watcher thread once the file is completely written;
+        # the file is read here, off the Tk thread
+        if not self.watcher:
+            return  # stopped while the file was settling
         try:
-            self.load_race_results(filepath)
-            self.show_status("Neue Daten geladen")
+            if self.catalog.update(path):
+                self.root.after(0, self.poll_results)
         except Exception as e:
-            self.show_status(f"Ladefehler: {str(e)}")
+            self.root.after(0, self.show_status, f"Ladefehler: {str(e)}")
+
+    def poll_results(self):
+        """Let the rotation pick the next race or page, then wait for its next deadline."""
+        previous = self.rotation.pages
+        change = self.rotation.poll()
+        if change:
+            pages, index = change
+            entry = self.rotation.entry
+            if pages is not previous:
+                self.hold_playlist(pages)
+            try:
+                # A race preempted right away still gets its first page on the wire
+                coalesce = pages is previous
+                if index == 0 and entry and 'rendered' not in entry.trace:
+                    self.show_result_page(pages, index, trace=entry.trace, coalesce=coalesce,
+                                          info={'source': 'auto-scan', 'race': entry.race,
+                                                'version': "%d.%d" % entry.version,
+                                                'file': os.path.basename(entry.path), 'pages': len(pages)})
+                else:
+                    self.show_result_page(pages, index, coalesce=coalesce)
+                if index == 0 and entry:
+                    waiting = self.catalog.pending()
+                    self.show_status(f"Neue Daten geladen: Rennen {entry.race} v{entry.version[0]}"
+                                     + (f" ({waiting} weitere in Warteschlange)" if waiting else ""))
+            except Exception as e:
+                self.show_status(f"Ladefehler: {str(e)}")
+        self.schedule_result_poll()
+
+    def schedule_result_poll(self):
+        if self.rotation_job:
+            self.root.after_cancel(self.rotation_job)
+            self.rotation_job = None
+        delay = self.rotation.next_poll()
+        if delay is not None:
+            self.rotation_job = self.root.after(int(delay * 1000) + 1, self.poll_results)
 
     def load_race_results(self, filename=None):
         if not filename:
@@ -256,56 +3167,53 @@ class LEDMatrixApp:
             )
         if not filename:
             return
-            
-        # Try different encodings
-        encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1']
-        lines = None
-        
-        for encoding in encodings:
-            try:
-                with open(filename, 'r', encoding=encoding) as file:
-                    lines = file.readlines()
-                break  # If successful, exit the loop
-            except UnicodeDecodeError:
-                continue
-        
-        if not lines:
+
+        trace = {'detected': time.time()}
+        try:
+            result = parse_result_file(filename)
+        except OSError:
             self.show_status("Fehler beim Lesen der Datei")
             return
-        
-        # Simply replace first line with Sommerregatta 2025
-        if lines:
-            lines[0] = "Sommerregatta 2025".ljust(NUM_COLS) + "\n"
+        trace['parsed'] = time.time()
+        self.show_result_pages(ResultPages(result, self.result_layout, self.transcoder), trace=trace,
+                               info={'source': 'manual', 'file': os.path.basename(filename)})
 
-        # --- NEW: Temporarily set all entries to normal for update ---
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                self.entries[row][col].config(state='normal')
-        # ------------------------------------------------------------
+    def prerender_result_file(self, filename):
+        return ResultPages(parse_result_file(filename), self.result_layout, self.transcoder)
 
-        self.clear_grid()
-        # Display file content in grid and highlight filled cells
-        self.root.update_idletasks()  # Single update at start
-        for row, line in enumerate(lines[:NUM_ROWS]):
-            line = line.rstrip()
-            for col, char in enumerate(line[:NUM_COLS]):
-                self.entries[row][col].delete(0, tk.END)
-                if char not in self.valid_chars:
-                    char = self.replacement_char
-                bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
-                self.entries[row][col].insert(0, char)
-        self.root.update()  # Single update at end
-
-        # --- NEW: Set entries to readonly if in race mode ---
-        if self.current_mode == "race_results":
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    self.entries[row][col].config(state='readonly')
-        # ----------------------------------------------------
+    def show_result_pages(self, pages, send=True, trace=None, info=None):
+        """Show the first page now and rotate through the rest; preempts any rotation."""
+        self.hold_playlist(pages)
+        self.show_result_page(*self.rotation.show(pages), send=send, trace=trace, info=info)
+        self.schedule_result_poll()
 
+    def hold_playlist(self, pages):
+        # A fresh result holds the playlist for at least one turn of its
+        # pages; the playlist then resumes where it left off
+        if self.playlist:
+            self.playlist.preempt(len(pages) * self.rotation.page_interval)
+            self.schedule_playlist()
+
+    def show_result_page(self, pages, index, send=True, trace=None, info=None, coalesce=True):
         self.set_race_mode()
-        self.send_data()
+        self.framebuffer.set_frame(pages.frames[index])
+        self.refresh_grid()
+        if trace is not None:
+            trace['rendered'] = time.time()
+        if send:
+            on_written = self.latency.on_written(trace, **(info or {})) if trace is not None else None
+            self.send_message(pages.messages[index], on_written, coalesce=coalesce)
+
+    def stop_page_rotation(self):
+        self.rotation.stop()
+        self.schedule_result_poll()
+
+    def ask_page_interval(self):
+        seconds = simpledialog.askinteger("Seitenwechsel", "Sekunden pro Ergebnisseite:",
+                                          initialvalue=int(self.rotation.page_interval),
+                                          minvalue=1, maxvalue=60)
+        if seconds:
+            self.rotation.page_interval = seconds
 
     def load_animation(self):
         filename = filedialog.askopenfilename(
@@ -315,69 +3223,132 @@ class LEDMatrixApp:
         if not filename:
             return
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                content = f.read()
-            frames, mode, fps = self.parse_animation_frames(content)
-            if not frames:
+            animation = open_animation(filename, self.transcoder)
+            if not animation:
+                animation.close()
                 self.show_status("Keine Frames gefunden")
                 return
-            self.animation_frames = frames
-            self.animation_index = 0
-            self.animation_running = True
-            self.animation_mode = mode
-            self.animation_fps = fps
-            self.animation_delay = int(1000 / self.animation_fps)
-            self.set_animation_mode()
-            self.show_status(f"Animation gestartet ({len(frames)} Frames, {mode}, {fps} FPS)")
-            self.play_animation()
+            self.start_animation(animation)
         except Exception as e:
             self.show_status(f"Fehler beim Laden: {e}")
 
-    def parse_animation_frames(self, content):
-        frames = []
-        current = []
-        mode = "LOOP"
-        fps = 2
-        for line in content.splitlines():
-            if line.strip().startswith("#MODE:"):
-                mode = line.strip().split(":", 1)[1].strip().upper()
-            elif line.strip().startswith("#FPS:"):
-                try:
-                    fps = max(1, int(line.strip().split(":", 1)[1].strip()))
-                except Exception:
-                    fps = 2
-            elif line.strip().startswith("FRAME"):
-                current = []
-            elif line.strip() == "==":
-                if len(current) == NUM_ROWS:
-                    frames.append(current)
-                current = []
-            else:
-                if len(current) < NUM_ROWS:
-                    current.append(line.ljust(NUM_COLS)[:NUM_COLS])
-        if len(current) == NUM_ROWS:
-            frames.append(current)
-        return frames, mode, fps
+    def start_animation(self, animation):
+        """Play a CompiledAnimation, AnimationFile or Ticker from its first frame."""
+        self.cancel_animation_job()
+        if self.animation:
+            self.animation.close()
+        self.animation = animation
+        self.animation_index = 0
+        self.animation_loop = 0
+        self.animation_running = True
+        self.animation_clock.set_fps(animation.fps)
+        self.animation_fps = self.animation_clock.fps
+        self.set_animation_mode()
+        self.animation_clock.restart()
+        loops = "unlimited" if animation.loops is None else animation.loops
+        self.show_status(f"Animation gestartet ({animation.summary()}, "
+                         f"{animation.mode}, {loops} Durchläufe, {self.animation_fps:g} FPS)")
+        self.play_animation()
+
+    def start_ticker(self):
+        """Scroll a text through one row; the rest of the current display stays."""
+        text = simpledialog.askstring("Laufschrift", "Text:")
+        if not text:
+            return
+        row = simpledialog.askinteger("Laufschrift", f"Zeile 1-{NUM_ROWS}:", initialvalue=NUM_ROWS,
+                                      minvalue=1, maxvalue=NUM_ROWS)
+        if row:
+            self.start_animation(Ticker({row - 1: text}, self.framebuffer.to_bytes(),
+                                        transcoder=self.transcoder))
+
+    def play_animation(self):
+        self.animation_job = None
+        if not self.animation_running or not self.animation:
+            return
+        # Frames missed because we fell behind are dropped, not played late
+        self.advance_animation(self.animation_clock.tick())
+        self.display_animation_frame(self.animation.message(self.animation_index))
+        # Show frame number and measured rate in status
+        stats = self.animation_clock.stats()
+        total = len(self.animation) if self.animation.complete else f"{len(self.animation)}+"
+        status = f"Frame {self.animation_index+1}/{total}"
+        if 'measured_fps' in stats:
+            status += f" · {stats['measured_fps']:.1f} FPS, Jitter {stats['jitter_ms']:.1f} ms"
+        self.show_status(status, duration=500)
+        if not self.advance_animation(1):
+            self.animation_running = False
+            self.show_status("Animation beendet")
+            return
+        self.animation_job = self.root.after(self.animation_clock.delay_ms(), self.play_animation)
+
+    def advance_animation(self, count):
+        """Move count frames on, wrapping per #LOOPS; False once the last loop is over."""
+        self.animation_index, self.animation_loop, playing = advance_position(
+            self.animation, self.animation_index, self.animation_loop, count)
+        return playing
+
+    def cancel_animation_job(self):
+        if self.animation_job:
+            self.root.after_cancel(self.animation_job)
+            self.animation_job = None
+
+    def load_playlist(self, filename=None):
+        if not filename:
+            filename = filedialog.askopenfilename(
+                filetypes=[("Playlist", "*.json"), ("All files", "*")],
+                title="Playlist wählen", initialfile=PLAYLIST_FILE)
+        if not filename:
+            return
+        try:
+            playlist = load_playlist(filename, self.templates, self.transcoder)
+        except (OSError, ValueError) as e:  # includes JSON errors
+            self.show_status(f"Playlist-Fehler: {e}")
+            return
+        self.stop_playlist()
+        self.animation_running = False
+        self.cancel_animation_job()
+        self.stop_page_rotation()
+        self.playlist = playlist
+        self.set_race_mode()  # read-only grid, no animation controls
+        self.current_mode = "playlist"
+        self.show_status(f"Playlist: {len(playlist.rotation)} Einträge, {len(playlist.timed)} zeitgesteuert")
+        self.run_playlist()
 
-    def play_animation(self):
-        if not self.animation_running or not self.animation_frames:
+    def run_playlist(self):
+        self.playlist_job = None
+        if not self.playlist:
             return
-        frame = self.animation_frames[self.animation_index]
-        self.display_animation_frame(frame)
-        # Show frame number in status
-        self.show_status(f"Frame {self.animation_index+1}/{len(self.animation_frames)}", duration=500)
-        self.animation_index += 1
-        if self.animation_index >= len(self.animation_frames):
-            if self.animation_mode == "ONCE":
-                self.animation_running = False
-                self.show_status("Animation beendet")
-                return
-            else:
-                self.animation_index = 0
-        self.root.after(self.animation_delay, self.play_animation)
+        change = self.playlist.poll()
+        if change:
+            item, message = change
+            if self.rotation.pages:
+                self.stop_page_rotation()  # the hold is over
+            self.current_mode = "playlist"
+            self.framebuffer.set_frame(memoryview(message)[len(FRAME_HEADER):])
+            self.refresh_grid()
+            self.send_message(message, source=item.source)
+        self.schedule_playlist()
+
+    def schedule_playlist(self):
+        if self.playlist_job:
+            self.root.after_cancel(self.playlist_job)
+            self.playlist_job = None
+        delay = self.playlist.next_poll() if self.playlist else None
+        if delay is not None:
+            self.playlist_job = self.root.after(int(delay * 1000) + 1, self.run_playlist)
+
+    def stop_playlist(self):
+        if self.playlist_job:
+            self.root.after_cancel(self.playlist_job)
+            self.playlist_job = None
+        if self.playlist:
+            self.playlist = None
+            self.show_status("Playlist gestoppt")
 
     def set_animation_mode(self):
         self.current_mode = "animation"
+        self.stop_playlist()
+        self.stop_page_rotation()
         # Add stop button if not present
         if not hasattr(self, "stop_animation_button"):
             self.stop_animation_button = tk.Button(self.root, text="Animation stoppen", command=self.stop_animation)
@@ -392,7 +3363,9 @@ class LEDMatrixApp:
             self.stop_animation_button.grid(row=NUM_ROWS + 3, column=0, columnspan=NUM_COLS, pady=5)
         # --- FPS Slider ---
         if not self.fps_slider:
-            self.fps_slider = tk.Scale(self.root, from_=1, to=10, orient=tk.HORIZONTAL,
+            # The serial link limits the usable rate (about 15 FPS at 38400 baud)
+            self.fps_slider = tk.Scale(self.root, from_=1, to=int(self.animation_clock.max_fps),
+                                       orient=tk.HORIZONTAL,
                                        label="FPS", bg=self.led_off_color, fg=self.text_color,
                                        troughcolor=self.led_on_color, highlightbackground='black',
                                        command=self.on_fps_change)
@@ -401,21 +3374,20 @@ class LEDMatrixApp:
         else:
             self.fps_slider.set(self.animation_fps)
             self.fps_slider.grid(row=NUM_ROWS + 4, column=0, columnspan=NUM_COLS, pady=5)
-        # Make grid readonly
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                self.entries[row][col].config(state='readonly')
+        self.set_grid_state('readonly')
 
     def on_fps_change(self, val):
         try:
             fps = int(val)
-            self.animation_fps = fps
-            self.animation_delay = int(1000 / max(1, fps))
+            if fps != self.animation_fps:
+                self.animation_clock.set_fps(fps)
+                self.animation_fps = self.animation_clock.fps
         except Exception:
             pass
 
     def stop_animation(self):
         self.animation_running = False
+        self.cancel_animation_job()
         if hasattr(self, "stop_animation_button"):
             self.stop_animation_button.grid_remove()
         if self.fps_slider:
@@ -423,36 +3395,22 @@ class LEDMatrixApp:
         self.show_status("Animation gestoppt")
         self.set_manual_mode()
 
-    def display_animation_frame(self, frame):
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                self.entries[row][col].config(state='normal')
-        for row, line in enumerate(frame):
-            for col, char in enumerate(line):
-                self.entries[row][col].delete(0, tk.END)
-                if char not in self.valid_chars:
-                    char = self.replacement_char
-                bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
-                self.entries[row][col].insert(0, char)
-        self.send_data()
-        if self.current_mode == "animation":
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    self.entries[row][col].config(state='readonly')
+    def display_animation_frame(self, message):
+        """Show a precompiled frame and send its cached message unchanged."""
+        self.framebuffer.set_frame(memoryview(message)[len(FRAME_HEADER):])
+        self.refresh_grid()
+        self.send_message(message)
 
     def set_manual_mode(self):
         self.current_mode = "manual"
         self.animation_running = False
+        self.stop_playlist()
+        self.stop_page_rotation()
         if hasattr(self, "stop_animation_button"):
             self.stop_animation_button.grid_remove()
         if self.fps_slider:
             self.fps_slider.grid_remove()
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                self.entries[row][col].config(state='normal')
-                self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
+        self.set_grid_state('normal')
 
     def set_race_mode(self):
         self.current_mode = "race_results"
@@ -461,196 +3419,1339 @@ class LEDMatrixApp:
             self.stop_animation_button.grid_remove()
         if self.fps_slider:
             self.fps_slider.grid_remove()
-        # Make all entries read-only
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                self.entries[row][col].config(state='readonly')
-                self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
+        self.set_grid_state('readonly')
 
-    def create_grid(self):
-        # Create frame for grid with padding
-        grid_frame = tk.Frame(self.root, padx=10, pady=10, bg='black')
-        grid_frame.grid(row=0, column=0)
-        
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                bg_color = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                entry = tk.Entry(grid_frame, width=2, justify="center",
-                               font=('Courier', 10, 'bold'),
-                               fg=self.text_color,
-                               bg=bg_color,
-                               insertbackground=self.text_color,
-                               highlightbackground='black',
-                               highlightthickness=1)
-                entry.grid(row=row, column=col, padx=1, pady=1)
-                entry.bind("<KeyRelease>", lambda e, r=row, c=col: self.on_key(e, r, c))
-                entry.bind("<Left>", lambda e, r=row, c=col: self.navigate("left", r, c))
-                entry.bind("<Right>", lambda e, r=row, c=col: self.navigate("right", r, c))
-                entry.bind("<Up>", lambda e, r=row, c=col: self.navigate("up", r, c))
-                entry.bind("<Down>", lambda e, r=row, c=col: self.navigate("down", r, c))
-                entry.bind("<BackSpace>", lambda e, r=row, c=col: self.handle_backspace(e, r, c))
-                entry.bind("<Home>", lambda e, r=row: self.shift_line_left(r))
-                entry.bind("<End>", lambda e, r=row, c=col: self.shift_right_of_cursor_left(r, c))
-                self.entries[row][col] = entry
+    def refresh_grid(self):
+        """Render pass: let the view redraw what changed, then flush once."""
+        start = time.perf_counter()
+        self.grid_view.render(self.framebuffer.data)
+        self.root.update_idletasks()
+        self.render_times.append(time.perf_counter() - start)
+
+    def set_grid_state(self, state):
+        self.grid_view.set_state(state)
 
     def is_defective(self, row, col):
         # First line except last 4, last line except last 5
         return (row == 0 and col < NUM_COLS - 4) or (row == NUM_ROWS - 1 and col < NUM_COLS - 5)
 
-    def navigate(self, direction, current_row, current_col):
-        next_row, next_col = current_row, current_col
-        
-        if direction == "left":
-            next_col = max(0, current_col - 1)
-        elif direction == "right":
-            next_col = min(NUM_COLS - 1, current_col + 1)
-        elif direction == "up":
-            next_row = max(0, current_row - 1)
-        elif direction == "down":
-            next_row = min(NUM_ROWS - 1, current_row + 1)
-            
-        self.entries[next_row][next_col].focus()
-        return "break"  # Prevents default behavior
-
-    def handle_backspace(self, event, row, col):
-        # Clear current cell
-        self.entries[row][col].delete(0, tk.END)
-        
-        if col > 0:  # Not at start of line
-            prev_col = col - 1
-            self.entries[row][prev_col].focus()
-        elif row > 0:  # At start of line and not first line
-            prev_row = row - 1
-            self.entries[prev_row][NUM_COLS-1].focus()
-        return "break"
-
     def shift_line_left(self, row):
         """Shift all characters in the line to the left, fill rightmost with space."""
-        for col in range(NUM_COLS - 1):
-            val = self.entries[row][col + 1].get()
-            self.entries[row][col].delete(0, tk.END)
-            self.entries[row][col].insert(0, val)
-        self.entries[row][NUM_COLS - 1].delete(0, tk.END)
-        self.entries[row][NUM_COLS - 1].insert(0, ' ')
+        line = self.framebuffer.get_row(row)
+        self.framebuffer.set_row(row, line[1:])
+        self.refresh_grid()
         return "break"
 
     def shift_right_of_cursor_left(self, row, col):
         """Shift all characters right of the cursor to the left, fill last with space."""
-        for i in range(col, NUM_COLS - 1):
-            val = self.entries[row][i + 1].get()
-            self.entries[row][i].delete(0, tk.END)
-            self.entries[row][i].insert(0, val)
-        self.entries[row][NUM_COLS - 1].delete(0, tk.END)
-        self.entries[row][NUM_COLS - 1].insert(0, ' ')
+        line = self.framebuffer.get_row(row)
+        self.framebuffer.set_row(row, line[:col] + line[col + 1:])
+        self.refresh_grid()
         return "break"
 
-    def on_key(self, event, row, col):
-        value = self.entries[row][col].get()
-        
-        # Handle navigation and special keys
-        if event.keysym in ['Left', 'Right', 'Up', 'Down', 'BackSpace']:
-            return
-        if event.keysym == 'Home':
-            self.shift_line_left(row)
-            return "break"
-        if event.keysym == 'End':
-            self.shift_right_of_cursor_left(row, col)
-            return "break"
-            
-        if value and value[-1] not in self.valid_chars:
-            # Replace invalid character with ?
-            self.entries[row][col].delete(0, tk.END)
-            self.entries[row][col].insert(0, self.replacement_char)
-            value = self.replacement_char
-
-        if len(value) > 1:
-            self.entries[row][col].delete(1, tk.END)
-
-        if value:
-            bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-            self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
-            next_row, next_col = row, col + 1
-            if next_col >= NUM_COLS:
-                # Zeile voll → mit Leerzeichen auffüllen
-                for i in range(NUM_COLS):
-                    if not self.entries[row][i].get():
-                        self.entries[row][i].insert(0, ' ')
-                next_row += 1
-                next_col = 0
-
-            if next_row < NUM_ROWS:
-                self.entries[next_row][next_col].focus()
-                self.entries[next_row][next_col].config(state='normal')
-
     def clear_grid(self):
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLS):
-                bg = self.defective_color if self.is_defective(row, col) else self.led_off_color
-                self.entries[row][col].delete(0, tk.END)
-                self.entries[row][col].configure(bg=bg, fg=self.text_color, readonlybackground=bg)
-                self.root.update()
-        # ...existing code...
+        self.stop_page_rotation()
+        self.framebuffer.clear()
+        self.refresh_grid()
 
     def send_brightness_command(self):
         if not self.ser:
             return
-        try:
-            msg = bytearray([0x01, 0xFF, 0x03])
-            self.ser.write(msg)
-            self.ser.flush()
-        except serial.SerialException as e:
-            self.show_status(f"Helligkeits-Fehler: {str(e)}")
+        self.writer.submit(BRIGHTNESS_COMMAND, coalesce=False)
 
-    def send_data(self):
+    def send_data(self, source=None):
         if not self.ser:
             if self.current_mode == "manual":
                 self.show_status("Test-Modus: Daten würden gesendet werden")
             return
 
+        board = self.send_target.get() if self.send_target else ""
+        self.send_message(self.framebuffer.to_message(), source=source, boards=[board] if board else None)
+        self.show_status(f"Daten gesendet an {board}" if board else "Daten gesendet")
+
+    def send_message(self, message, on_written=None, source=None, boards=None, coalesce=True):
+        """Hand a complete display message to the writer thread; the source defaults to the mode."""
+        if self.writer:
+            target = {'boards': boards} if boards is not None else {}
+            self.writer.submit(message, coalesce=coalesce, on_written=on_written,
+                               source=source or self.current_mode, **target)
+
+    def on_writer_error(self, error):
+        # Called on the writer thread; hand over to the Tk thread
+        self.root.after(0, self.show_status, f"Sende-Fehler: {str(error)}")
+
+    def show_writer_stats(self):
+        if not self.writer:
+            self.show_status("Test-Modus: keine serielle Verbindung")
+            return
+        stats = self.writer.stats()
+        text = (f"{stats['frames_written']} Frames gesendet, "
+                f"{stats['frames_coalesced']} übersprungen")
+        if 'last_latency_ms' in stats:
+            text += (f", letzter Frame {stats['last_latency_ms']:.1f} ms "
+                     f"(Ø Warten {stats['avg_wait_ms']:.1f} ms, Ø Schreiben {stats['avg_write_ms']:.1f} ms)")
+        for name, board in stats.get('boards', {}).items():
+            text += (f"\n{name}: {board['frames_written']} Frames, {board['bytes_per_second']:.0f} B/s, "
+                     f"Rückstand {board['lag_ms']:.0f} ms")
+        self.show_status(text, duration=8000)
+
+    def start_push_server(self, port):
+        self.push_server = PushServer(self.writer, port=port, layout=self.result_layout,
+                                      transcoder=self.transcoder, templates=lambda: self.templates,
+                                      on_push=self.on_push)
         try:
-            all_text = b''
-            for row_idx in range(NUM_ROWS):
-                text = ''.join(self.entries[row_idx][col].get() or ' ' for col in range(NUM_COLS))
-                text = text[:NUM_COLS].ljust(NUM_COLS)
-                all_text += text.encode('iso-8859-1', errors='replace')
-            msg = bytearray()
-            msg.append(0x01)
-            msg.append(0xFF)
-            msg.extend(all_text)
-            self.ser.write(msg)
-            self.ser.flush()
-            self.show_status("Daten gesendet")
-        except serial.SerialException as e:
-            self.show_status(f"Sende-Fehler: {str(e)}")
+            self.push_server.start()
+        except OSError as e:
+            self.push_server = None
+            messagebox.showerror("Push-Schnittstelle", f"Port {port}: {e}")
+
+    def on_push(self, kind, content):
+        # Called on the push server thread; the board already has the content.
+        # A burst is mirrored once, with its last item
+        with self.push_lock:
+            scheduled = self.pushed is not None
+            self.pushed = (kind, content)
+        if not scheduled:
+            self.root.after(0, self.show_pushed)
+
+    def show_pushed(self):
+        with self.push_lock:
+            kind, content = self.pushed
+            self.pushed = None
+        self.cancel_animation_job()
+        if kind == 'result':
+            self.show_result_pages(content, send=False)
+        else:
+            if self.playlist:
+                # A pushed frame holds the playlist like a result does
+                self.playlist.preempt()
+                self.schedule_playlist()
+            else:
+                self.set_manual_mode()
+            self.framebuffer.set_frame(content)
+            self.refresh_grid()
+
+    def show_latency_stats(self):
+        if not self.latency.stats():
+            self.show_status("Noch keine Ergebnisse gesendet")
+            return
+        messagebox.showinfo("Latenz Datei → Tafel",
+                            self.latency.report() + f"\n\nProtokoll: {self.latency.log_path or 'aus'}")
+
+    def on_stall(self, record):
+        self.show_status(f"Oberfläche blockiert: {record['duration_ms']:.0f} ms in {record['where']}",
+                         duration=8000)
+
+    def show_stalls(self):
+        stats = self.watchdog.stats()
+        text = f"{stats['stalls']} Blockaden über {self.watchdog.threshold * 1000:.0f} ms"
+        if 'lag_max_ms' in stats:
+            text += (f"\nVerzögerung der Ereignisschleife: p50 {stats['lag_p50_ms']:.1f} ms, "
+                     f"p99 {stats['lag_p99_ms']:.1f} ms, max {stats['lag_max_ms']:.1f} ms")
+        for record in list(self.watchdog.stalls)[-3:]:
+            text += f"\n\n{record['time']}: {record['duration_ms']:.0f} ms\n" + "\n".join(record['stack'][-6:])
+        messagebox.showinfo("Blockaden", text)
+
+    def start_profiler(self):
+        if self.profiler:
+            self.show_status("Profiler läuft bereits")
+            return
+        self.profiler = SamplingProfiler()
+        self.profiler.start()
+        self.show_status("Profiler läuft – Modus → Profiler stoppen schreibt das Profil", duration=5000)
+
+    def stop_profiler(self):
+        if not self.profiler:
+            self.show_status("Profiler läuft nicht")
+            return
+        self.profiler.stop()
+        path = f"regatta_profile_{datetime.now():%Y%m%d_%H%M%S}.folded"
+        try:
+            samples = self.profiler.write(path)
+            self.show_status(f"Profil mit {samples} Stichproben gespeichert: {path}", duration=8000)
+        except OSError as e:
+            self.show_status(f"Profil nicht gespeichert: {e}")
+        self.profiler = None
+
+    def show_push_stats(self):
+        if not self.push_server:
+            self.show_status("Push-Schnittstelle nicht aktiv (--push-port)")
+            return
+        stats = self.push_server.stats()
+        text = (f"Push: {stats['tcp']} TCP, {stats['udp']} UDP, {stats['http']} HTTP, "
+                f"{stats['rejected']} abgelehnt")
+        if 'ingest_to_wire_p50_ms' in stats:
+            text += (f", bis zur Leitung {stats['ingest_to_wire_p50_ms']:.1f} ms "
+                     f"(p95 {stats['ingest_to_wire_p95_ms']:.1f} ms)")
+        self.show_status(text, duration=8000)
 
     def run_initialization_test(self):
-        original_mode = self.current_mode
+        """Lamp test: all '0', then all '1', 5 s each, driven by root.after (Esc skips)."""
+        self.lamp_test_return_mode = self.current_mode
         self.current_mode = "initialization"
-        try:
-            self.clear_grid()
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    self.entries[row][col].insert(0, '0')
-            self.send_data()
-            time.sleep(5)
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    self.entries[row][col].delete(0, tk.END)
-                    self.entries[row][col].insert(0, '1')
-            self.send_data()
-            time.sleep(5)
-            self.clear_grid()
+        self.lamp_test_step(0)
+
+    def lamp_test_step(self, step):
+        if self.current_mode != "initialization":
+            return  # skipped, or something else took over the board
+        if step < 2:
+            self.framebuffer.set_rows([str(step) * NUM_COLS] * NUM_ROWS)
+            self.refresh_grid()
             self.send_data()
-        finally:
-            self.current_mode = original_mode
+            self.root.after(5000, self.lamp_test_step, step + 1)
+        else:
+            self.skip_initialization_test()
+
+    def skip_initialization_test(self):
+        if self.current_mode != "initialization":
+            return
+        self.current_mode = self.lamp_test_return_mode
+        self.clear_grid()
+        self.send_data()
 
     def on_closing(self):
+        self.watchdog.stop()
+        if self.profiler:
+            self.profiler.stop()
+        if self.push_server:
+            self.push_server.stop()
+        if self.writer:
+            self.writer.close()
+        elif self.recorder:
+            self.recorder.close()
         self.root.destroy()
 
-if __name__ == "__main__":
-    port_selector = PortSelector()
+
+def open_board(args, record=True):
+    """Serial port and writer for the command-line tools; None if the port fails."""
+    settings = load_settings()
+    port = args.port or settings.get('last_port')
+    if not port:
+        print("Kein serieller Port angegeben (--port)", file=sys.stderr)
+        return None
+    try:
+        ser = open_serial(port, args.baudrate)
+    except serial.SerialException as e:
+        print(f"Serieller Fehler: {e}", file=sys.stderr)
+        return None
+    recorder = open_session_recorder(settings.get('session_log', SESSION_LOG)) if record else None
+    return open_writer(ser, args.board if args.board is not None else settings.get('boards'),
+                       on_error=lambda e: print(f"Sende-Fehler: {e}", file=sys.stderr),
+                       recorder=recorder, baudrate=args.baudrate)
+
+
+def cli_send_results(args):
+    try:
+        pages = ResultPages(parse_result_file(args.file), ResultLayout(title=args.title),
+                            make_transcoder(load_settings()))
+    except (OSError, ValueError) as e:
+        print(f"Ergebnisdatei nicht lesbar: {e}", file=sys.stderr)
+        return 1
+    writer = open_board(args)
+    if not writer:
+        return 1
+    try:
+        writer.submit(pages.messages[0], source='race_results')
+        if len(pages) > 1:
+            # More than six boats: keep rotating the pages until interrupted
+            print(f"{len(pages)} Seiten, Wechsel alle {args.page_interval:g} s (Strg+C beendet)")
+            index = 0
+            while True:
+                time.sleep(args.page_interval)
+                index = (index + 1) % len(pages)
+                writer.submit(pages.messages[index], source='race_results')
+        writer.wait_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+    return 0
+
+
+def cli_send_template(args):
+    try:
+        templates = TemplateStore(args.templates_file, make_transcoder(load_settings()))
+    except (OSError, ValueError) as e:
+        print(f"Vorlagen nicht lesbar: {e}", file=sys.stderr)
+        return 1
+    if args.list:
+        for name in templates.names(args.name or ''):
+            print(name)
+        return 0
+    name = templates.find(args.name or '')
+    if name is None:
+        matches = templates.names(args.name or '')
+        print(f"Mehrdeutig: {', '.join(matches)}" if matches else f"Unbekannte Vorlage: {args.name}",
+              file=sys.stderr)
+        return 1
+    writer = open_board(args)
+    if not writer:
+        return 1
+    writer.submit(templates.message(name), source='template')
+    writer.wait_idle()
+    writer.close()
+    return 0
+
+
+def cli_send_animation(args):
+    try:
+        animation = open_animation(args.file, make_transcoder(load_settings()))
+    except (OSError, ValueError) as e:
+        print(f"Animation nicht lesbar: {e}", file=sys.stderr)
+        return 1
+    if not animation:
+        print("Keine Frames gefunden", file=sys.stderr)
+        return 1
+    writer = open_board(args)
+    if not writer:
+        return 1
+    send_animation(writer, animation, args.fps or animation.fps)
+    return 0
+
+
+def send_animation(writer, animation, fps):
+    """Play an animation or ticker on the board until it ends or Ctrl+C; closes both."""
+    clock = FrameClock(fps)
+    index, loop, playing = 0, 0, True
+    try:
+        while playing:
+            index, loop, playing = advance_position(animation, index, loop, clock.tick())
+            writer.submit(animation.message(index), source='animation')
+            index, loop, playing = advance_position(animation, index, loop, 1)
+            time.sleep(clock.delay())
+        writer.wait_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+        animation.close()
+
+
+def cli_send_ticker(args):
+    transcoder = make_transcoder(load_settings())
+    static = None
+    if args.template:
+        try:
+            templates = TemplateStore(args.templates_file, transcoder)
+        except (OSError, ValueError) as e:
+            print(f"Vorlagen nicht lesbar: {e}", file=sys.stderr)
+            return 1
+        name = templates.find(args.template)
+        if name is None:
+            print(f"Unbekannte Vorlage: {args.template}", file=sys.stderr)
+            return 1
+        static = templates.frame(name)
+    try:
+        ticker = Ticker({row - 1: args.text for row in args.row or [NUM_ROWS]}, static, fps=args.fps,
+                        loops=args.loops, transcoder=transcoder)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    writer = open_board(args)
+    if not writer:
+        return 1
+    send_animation(writer, ticker, args.fps)
+    return 0
+
+
+class ResultService:
+    """The auto-scan loop of the daemon, without Tk; the load test drives it too.
+
+    on_result_file() is the DirectoryWatcher callback and on_push() the
+    PushServer one. Both only wake run(), which puts whatever the rotation,
+    or between results the playlist, chooses on the board until stop().
+    """
+
+    def __init__(self, writer, catalog, rotation, latency, playlist=None, verbose=True):
+        self.writer = writer
+        self.catalog = catalog
+        self.rotation = rotation
+        self.latency = latency
+        self.playlist = playlist
+        self.verbose = verbose
+        self.wake = Event()
+        self.pushed = deque()  # (kind, content) already on the board, from the push server thread
+        self.running = False
+
+    def on_result_file(self, path):
+        try:
+            if self.catalog.update(path):
+                self.wake.set()
+        except Exception as e:
+            print(f"Ladefehler: {path}: {e}", file=sys.stderr)
+
+    def on_push(self, kind, content):
+        self.pushed.append((kind, content))
+        self.wake.set()
+
+    def step(self):
+        """Send whatever is due; returns seconds until the next deadline, None to wait for news."""
+        rotation, playlist = self.rotation, self.playlist
+        while self.pushed:
+            kind, content = self.pushed.popleft()
+            if kind == 'result':
+                rotation.show(content)  # first page is already sent
+                if self.verbose:
+                    print(f"Push: {content.result.header}", flush=True)
+            else:
+                rotation.stop()
+            if playlist:
+                playlist.preempt(len(content) * rotation.page_interval if kind == 'result' else 0.0)
+        previous = rotation.pages
+        change = rotation.poll()
+        if change:
+            pages, index = change
+            entry = rotation.entry
+            if playlist and pages is not previous:
+                playlist.preempt(len(pages) * rotation.page_interval)
+            on_written = None
+            if index == 0 and entry and 'written' not in entry.trace:
+                on_written = self.latency.on_written(entry.trace, source='daemon', race=entry.race,
+                                                     version="%d.%d" % entry.version,
+                                                     file=os.path.basename(entry.path), pages=len(pages))
+            # A race preempted right away still gets its first page on the wire
+            self.writer.submit(pages.messages[index], coalesce=pages is previous, on_written=on_written,
+                               source='race_results')
+            if index == 0 and entry and self.verbose:
+                print(f"Rennen {entry.race} v{entry.version[0]}: {os.path.basename(entry.path)}", flush=True)
+        change = playlist.poll() if playlist else None
+        if change:
+            item, message = change
+            rotation.stop()  # the result hold is over
+            self.writer.submit(message, source=item.source)
+        delays = [delay for delay in (rotation.next_poll(), playlist and playlist.next_poll())
+                  if delay is not None]
+        return min(delays) if delays else None
+
+    def run(self):
+        """Serve until stop(); blocks the calling thread."""
+        self.running = True
+        while self.running:
+            self.wake.wait(self.step())
+            self.wake.clear()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+
+def cli_daemon(args):
+    """Auto-scan without GUI: watch a directory and put new results on the board."""
+    writer = open_board(args)
+    if not writer:
+        return 1
+    layout = ResultLayout(title=args.title)
+    transcoder = make_transcoder(load_settings())
+    catalog = ResultCatalog(parse=lambda path: ResultPages(parse_result_file(path), layout, transcoder))
+    rotation = ResultRotation(catalog, dwell=args.dwell, page_interval=args.page_interval)
+    latency = LatencyTracker(load_settings().get('latency_log', LATENCY_LOG))
+
+    try:
+        store = TemplateStore(transcoder=transcoder)
+    except (OSError, ValueError) as e:
+        print(f"Alte Vorlagen nicht lesbar: {e}", file=sys.stderr)
+        store = TemplateStore(transcoder=transcoder, legacy_path='')
+
+    def templates():
+        # Picks up what the GUI saved in the meantime
+        store.refresh()
+        return store
+
+    playlist = None
+    if args.playlist:
+        try:
+            playlist = load_playlist(args.playlist, templates(), transcoder)
+        except (OSError, ValueError) as e:
+            print(f"Playlist {args.playlist}: {e}", file=sys.stderr)
+            writer.close()
+            return 1
+    service = ResultService(writer, catalog, rotation, latency, playlist)
+
+    push_server = None
+    if args.push_port:
+        push_server = PushServer(writer, host=args.push_host, port=args.push_port, layout=layout,
+                                 transcoder=transcoder, templates=templates, on_push=service.on_push)
+        try:
+            push_server.start()
+        except OSError as e:
+            print(f"Push-Port {args.push_port}: {e}", file=sys.stderr)
+            writer.close()
+            return 1
+
+    watcher = DirectoryWatcher(args.watch, service.on_result_file,
+                               on_error=lambda e: print(f"Scan-Fehler: {e}", file=sys.stderr))
+    Thread(target=watcher.run, name="watcher", daemon=True).start()
+    print(f"Überwache {args.watch} ({'inotify' if watcher.use_inotify else 'scandir'})")
+    if push_server:
+        print(f"Push: TCP/UDP {args.push_host}:{push_server.port}, HTTP {args.push_host}:{push_server.http_port}")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        if push_server:
+            push_server.stop()
+        writer.close()
+    if latency.stats():
+        print(latency.report())
+    return 0
+
+
+def push_requests(requests, via, host, port):
+    """Send requests to a PushServer; returns the replies (none over UDP)."""
+    import_push()
+    lines = [json.dumps(request).encode() + b'\n' for request in requests]
+    if via == 'udp':
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for line in lines:
+                sock.sendto(line, (host, port))
+        return []
+    if via == 'http':
+        replies = []
+        for line in lines:
+            request = urllib.request.Request(f"http://{host}:{port + 1}/push", data=line,
+                                             headers={'Content-Type': 'application/json'})
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    replies.append(json.load(response))
+            except urllib.error.HTTPError as e:
+                replies.append(json.load(e))
+        return replies
+    with socket.create_connection((host, port), timeout=10) as sock:
+        sock.sendall(b''.join(lines))
+        with sock.makefile('rb') as reader:
+            return [json.loads(reader.readline()) for _ in lines]
+
+
+def cli_push(args):
+    """Stand-in for the timing system: push content to a running push server."""
+    import_push()
+    port = args.push_port or PUSH_PORT
+    if args.burst:
+        # Numbered frames as fast as possible; the server should keep only what the link can carry
+        requests = [{'rows': [f"Burst {i + 1}/{args.burst}"] + (args.rows or [])} for i in range(args.burst)]
+    elif args.result:
+        with open(args.result, 'rb') as f:
+            requests = [{'result': decode_result_bytes(f.read())}]
+    elif args.frame:
+        with open(args.frame, 'rb') as f:
+            requests = [{'frame': base64.b64encode(f.read()).decode()}]
+    elif args.template:
+        requests = [{'template': args.template}]
+    elif args.rows:
+        requests = [{'rows': args.rows}]
+    else:
+        requests = [{'stats': True}]
+    stats_only = 'stats' in requests[0]
+    try:
+        for reply in push_requests(requests, args.via, args.push_host, port):
+            if not reply.get('ok', True):
+                print(f"Abgelehnt: {reply['error']}", file=sys.stderr)
+            elif args.verbose or stats_only:
+                print(json.dumps(reply, indent=2))
+        if not stats_only:
+            time.sleep(0.2 + wire_time(len(FRAME_HEADER) + FRAME_SIZE) * 2)
+            stats = push_requests([{'stats': True}], 'http' if args.via == 'http' else 'tcp',
+                                  args.push_host, port)[0]
+            print(json.dumps(stats, indent=2))
+    except OSError as e:
+        print(f"Push-Server nicht erreichbar ({args.push_host}:{port}): {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cli_emulate(args):
+    """Run the display emulator on a pty until interrupted."""
+    def print_event(event):
+        elapsed = event.time - emulator.started
+        if event.kind == 'frame':
+            first_row = event.data[:NUM_COLS].decode(ENCODING).rstrip()
+            print(f"{elapsed:9.3f}  Frame       {first_row!r} {event.detail}".rstrip())
+            if args.show:
+                for row in range(NUM_ROWS):
+                    print(" " * 11 + "|" + event.data[row * NUM_COLS:(row + 1) * NUM_COLS].decode(ENCODING) + "|")
+        elif event.kind == 'brightness':
+            print(f"{elapsed:9.3f}  Helligkeit")
+        else:
+            print(f"{elapsed:9.3f}  FEHLER      {event.detail}")
+
+    emulator = DisplayEmulator(args.baudrate, None if args.quiet else print_event, pace=not args.no_pace)
+    try:
+        name = emulator.open(args.link)
+    except (OSError, ImportError) as e:
+        print(f"Pseudo-Terminal nicht verfügbar: {e}", file=sys.stderr)
+        return 1
+    print(f"Anzeige-Emulator auf {name} ({args.baudrate} Baud), z. B.: python regatta.py --port {name}",
+          flush=True)
+    try:
+        emulator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.close()
+    print(json.dumps(emulator.stats(), indent=2))
+    return 0
+
+
+class FakeSerial:
+    """Serial port stand-in for the benchmarks; optionally as slow as the real line."""
+
+    def __init__(self, baudrate=BAUDRATE, pace=False, on_write=None):
+        self.baudrate = baudrate
+        self.pace = pace
+        self.on_write = on_write
+        self.writes = 0
+        self.bytes_written = 0
+
+    def write(self, data):
+        if self.pace:
+            time.sleep(wire_time(len(data), self.baudrate))
+        self.writes += 1
+        self.bytes_written += len(data)
+        if self.on_write:
+            self.on_write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def bench_result_text(race, boats):
+    lines = ["Berliner Sommerregatta 2025", f"Re. {race} Männer 4x+ Finale A"]
+    lines += [f"{rank}  {rank % 6 + 1}  Ruderclub Grünau-Köpenick {rank} / Berliner RC  "
+              f"{6 + rank // 60}:{rank % 60:02d}.{rank * 7 % 100:02d}" for rank in range(1, boats + 1)]
+    return "\n".join(lines) + "\n"
+
+
+def bench_animation_text(frames):
+    blocks = ["#MODE:LOOP", "#FPS:15"]
+    for number in range(frames):
+        rows = [f"Frame {number:>6} Zeile {row} {'*' * (number % 10)}" for row in range(NUM_ROWS)]
+        blocks.append(f"FRAME {number}\n" + "\n".join(rows) + "\n==")
+    return "\n".join(blocks) + "\n"
+
+
+def time_calls(func, calls, setup=None):
+    """Per-call durations in seconds; setup(i) runs untimed before each call."""
+    times = []
+    for i in range(calls):
+        if setup:
+            setup(i)
+        start = time.perf_counter()
+        func(i)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize_times(times, **extra):
+    times = sorted(times)
+    summary = {'calls': len(times), 'mean_ms': sum(times) / len(times) * 1000,
+               'min_ms': times[0] * 1000}
+    for percent in (50, 90, 99):
+        summary[f'p{percent}_ms'] = percentile(times, percent) * 1000
+    summary['max_ms'] = times[-1] * 1000
+    summary.update(extra)
+    return summary
+
+
+def bench_headless(args, directory):
+    """Hot paths that do not need Tk."""
+    results = {}
+    layout = ResultLayout(title=RESULT_TITLE)
+    files = []
+    for race, boats in ((101, 6), (102, 14)):  # one page, three pages
+        path = os.path.join(directory, f"Bench_R{race}_v1_0.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(bench_result_text(race, boats))
+        files.append(path)
+    results['result_pages'] = summarize_times(time_calls(
+        lambda i: ResultPages(parse_result_file(files[i % 2]), layout), args.calls))
+
+    framebuffer = FrameBuffer()
+    results['send_data_assembly'] = summarize_times(time_calls(
+        lambda i: framebuffer.to_message(), args.calls,
+        setup=lambda i: framebuffer.set_cell(i % NUM_ROWS, i % NUM_COLS, "X")))
+
+    content = bench_animation_text(args.animation_frames)
+    results['parse_animation'] = summarize_times(time_calls(
+        lambda i: parse_animation(content), args.repeat),
+        frames=args.animation_frames, bytes=len(content.encode()))
+
+    big = os.path.join(directory, "bench_animation.txt")
+    with open(big, 'w', encoding='utf-8') as f:
+        f.write(bench_animation_text(args.animation_frames * 10))
+    def first_frame(i):
+        animation = AnimationFile(big)
+        animation.message(0)
+        animation.close()
+    results['open_animation_lazy_first_frame'] = summarize_times(time_calls(first_frame, args.repeat),
+                                                                 frames=args.animation_frames * 10,
+                                                                 bytes=os.path.getsize(big))
+
+    results['auto_scan_cycle'] = bench_auto_scan(args, os.path.join(directory, "scan"))
+    return results
+
+
+def bench_auto_scan(args, directory):
+    """File closed in the watched folder until its first page is on the (fake) wire."""
+    os.makedirs(directory)
+    written = []
+    wire = Event()
+
+    def on_write(data):
+        written.append(time.perf_counter())
+        wire.set()
+
+    writer = SerialWriter(FakeSerial(on_write=on_write))
+    layout = ResultLayout(title=RESULT_TITLE)
+    catalog = ResultCatalog(parse=lambda path: ResultPages(parse_result_file(path), layout))
+    rotation = ResultRotation(catalog)
+
+    def on_result_file(path):
+        if catalog.update(path):
+            change = rotation.poll()
+            if change:
+                pages, index = change
+                writer.submit(pages.messages[index])
+
+    watcher = DirectoryWatcher(directory, on_result_file, debounce=args.debounce)
+    Thread(target=watcher.run, kwargs={'report_newest': False}, name="watcher", daemon=True).start()
+    time.sleep(0.2)  # let the watcher prime
+    times = []
+    missed = 0
+    try:
+        for race in range(1, args.scan_cycles + 1):
+            wire.clear()
+            with open(os.path.join(directory, f"Bench_R{race}_v1_0.txt"), 'w', encoding='utf-8') as f:
+                f.write(bench_result_text(race, 6))
+            closed = time.perf_counter()
+            if wire.wait(5.0):
+                times.append(written[-1] - closed)
+            else:
+                missed += 1
+    finally:
+        watcher.stop()
+        writer.close()
+    if not times:
+        return {'skipped': "keine Datei erkannt"}
+    return summarize_times(times, missed=missed, debounce_ms=args.debounce * 1000,
+                           watcher='inotify' if watcher.use_inotify else 'scandir')
+
+
+def bench_gui(args, directory):
+    """Hot paths through LEDMatrixApp; needs a display."""
+    try:
+        import_tk()
+    except ImportError as e:
+        return {name: {'skipped': str(e)} for name in GUI_BENCHMARKS}
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:  # no display
+        return {name: {'skipped': str(e)} for name in GUI_BENCHMARKS}
+    root.withdraw()
+    fake = FakeSerial()
+    app = LEDMatrixApp(root, renderer=args.renderer, lamp_test=False, ser=fake, record=False, boards=[])
+    app.latency = LatencyTracker(log_path=None)  # keep benchmark loads out of the operator's log
+    app.writer.recorder = SessionRecorder(os.path.join(directory, "bench_session.bin"))
+    results = {}
+    try:
+        files = []
+        for race, boats in ((201, 6), (202, 14)):
+            path = os.path.join(directory, f"Bench_R{race}_v1_0.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(bench_result_text(race, boats))
+            files.append(path)
+        results['load_race_results'] = summarize_times(time_calls(
+            lambda i: app.load_race_results(files[i % 2]), args.calls))
+
+        animation = parse_animation(bench_animation_text(100))
+        results['display_animation_frame'] = summarize_times(time_calls(
+            lambda i: app.display_animation_frame(animation.message(i % len(animation))), args.calls))
+
+        rows = [f"Zeile {row} " * 5 for row in range(NUM_ROWS)]
+
+        def fill(i):
+            app.framebuffer.set_rows(rows)
+            app.refresh_grid()
+        results['clear_grid'] = summarize_times(time_calls(lambda i: app.clear_grid(), args.calls, setup=fill))
+
+        app.set_manual_mode()
+        results['send_data'] = summarize_times(time_calls(
+            lambda i: app.send_data(), args.calls,
+            setup=lambda i: app.framebuffer.set_cell(i % NUM_ROWS, i % NUM_COLS, "X")))
+        for summary in results.values():
+            summary['renderer'] = args.renderer
+    finally:
+        app.on_closing()
+    return results
+
+
+GUI_BENCHMARKS = ('load_race_results', 'display_animation_frame', 'clear_grid', 'send_data')
+
+
+class ResultStorm:
+    """Reproducible flood of result files for the load test.
+
+    Files arrive in bursts of `burst` at `rate` files per second on
+    average. Some are written in two parts with `pause` seconds in
+    between, some under a temporary name and renamed into place, the way
+    timing systems write them. Some races get a v2 correction a few bursts
+    later, and a quarter of those are overtaken by a late v1.
+
+    Before the storm, `trickle` races with `trickle_boats` boats arrive
+    one at a time, `gap` seconds apart, each into an empty queue.
+    """
+
+    def __init__(self, directory, races=100, burst=10, rate=20.0, boats=14, partial=0.2, rename=0.2,
+                 corrections=0.2, pause=0.1, seed=1, trickle=0, trickle_boats=14, gap=1.0):
+        rng = random.Random(seed)
+        self.directory = directory
+        self.burst = burst
+        self.rate = rate
+        self.pause = pause
+        self.gap = gap
+        self.final = {}  # race -> version whose result must reach the board
+        self.boats = {}  # file name -> boats in the complete file
+        self.counts = Counter()
+        self.trickle = list(range(races + 1, races + trickle + 1))
+        for race in self.trickle:
+            self.final[race] = "1.0"
+            self.boats[f"Storm_R{race}_v1_0.txt"] = trickle_boats
+        events = []  # (order, race, version, boats, how)
+        for race in range(1, races + 1):
+            order = len(events)
+            count = rng.randint(3, boats)
+            self.final[race] = "1.0"
+            if rng.random() < corrections:
+                later = order + rng.randint(burst, 3 * burst) + 0.5
+                events.append((later, race, 2, max(3, count + rng.choice((-1, 0, 1)))))
+                self.final[race] = "2.0"
+                if rng.random() < 0.25:
+                    order = later + 0.25  # the v1 arrives after its correction
+            events.append((order, race, 1, count))
+        self.events = []
+        for _, race, version, count in sorted(events):
+            roll = rng.random()
+            how = 'partial' if roll < partial else 'rename' if roll < partial + rename else 'write'
+            self.events.append((race, version, count, how))
+            self.boats[f"Storm_R{race}_v{version}_0.txt"] = count
+            self.counts[how] += 1
+        self.cpu = 0.0
+        self.finished = None
+
+    def text(self, race, boats, version):
+        text = bench_result_text(race, boats)
+        return text.replace("Finale A", f"Finale A Korrektur {version}", 1) if version > 1 else text
+
+    def run(self):
+        """Write every file on schedule; blocks the calling thread."""
+        cpu = time.thread_time()
+        for race in self.trickle:
+            with open(os.path.join(self.directory, f"Storm_R{race}_v1_0.txt"), 'wb') as f:
+                f.write(self.text(race, self.boats[f"Storm_R{race}_v1_0.txt"], 1).encode('utf-8'))
+            time.sleep(self.gap)
+        started = time.monotonic()
+        unfinished = []  # (due, open file, rest of its bytes)
+        for number, (race, version, boats, how) in enumerate(self.events):
+            if number % self.burst == 0:
+                self.complete(unfinished, until=started + number / self.rate)
+            path = os.path.join(self.directory, f"Storm_R{race}_v{version}_0.txt")
+            data = self.text(race, boats, version).encode('utf-8')
+            if how == 'partial':
+                f = open(path, 'wb')
+                f.write(data[:len(data) // 2])
+                f.flush()
+                unfinished.append((time.monotonic() + self.pause, f, data[len(data) // 2:]))
+            elif how == 'rename':
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace(path + '.tmp', path)
+            else:
+                with open(path, 'wb') as f:
+                    f.write(data)
+        self.complete(unfinished)
+        self.finished = time.monotonic()
+        self.cpu = time.thread_time() - cpu
+
+    def complete(self, unfinished, until=None):
+        """Finish partial files as they come due, until `until` or until none is left."""
+        while True:
+            now = time.monotonic()
+            for entry in [entry for entry in unfinished if entry[0] <= now]:
+                _, f, rest = entry
+                f.write(rest)
+                f.close()
+                unfinished.remove(entry)
+            if (until is None and not unfinished) or (until is not None and now >= until):
+                return
+            deadlines = [due for due, _, _ in unfinished] + ([until] if until is not None else [])
+            time.sleep(max(0.0, min(deadlines) - now))
+
+
+def loadtest_headless(args, directory, tracker, checked, ser, wait):
+    """The daemon's ingestion: watcher thread, ResultService loop, SerialWriter."""
+    writer = SerialWriter(ser)
+    layout = ResultLayout(title=RESULT_TITLE)
+    catalog = ResultCatalog(parse=checked(lambda path: ResultPages(parse_result_file(path), layout)))
+    rotation = ResultRotation(catalog, dwell=args.dwell, page_interval=args.page_interval)
+    service = ResultService(writer, catalog, rotation, tracker, verbose=False)
+    watcher = DirectoryWatcher(directory, service.on_result_file, debounce=args.debounce,
+                               use_inotify=False if args.scandir else None)
+    Thread(target=watcher.run, kwargs={'report_newest': False}, name="watcher", daemon=True).start()
+    Thread(target=service.run, name="daemon", daemon=True).start()
+    try:
+        peak = wait(catalog, pump=None)
+    finally:
+        watcher.stop()
+        service.stop()
+        writer.wait_idle(5.0)
+        writer.close()
+    return {'path': 'daemon', 'watcher': 'inotify' if watcher.use_inotify else 'scandir',
+            'queue_peak': peak, 'writer': writer.stats()}
+
+
+def loadtest_gui(args, directory, tracker, checked, ser, wait):
+    """The GUI's ingestion: auto_scan_thread, poll_results on the Tk loop; None without a display."""
+    try:
+        import_tk()
+    except ImportError as e:
+        print(f"GUI nicht verfügbar: {e}", file=sys.stderr)
+        return None
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:  # no display
+        print(f"GUI nicht verfügbar: {e}", file=sys.stderr)
+        return None
+    root.withdraw()
+    app = LEDMatrixApp(root, lamp_test=False, ser=ser, record=False, boards=[])
+    app.latency = tracker
+    app.catalog.parse = checked(app.catalog.parse)
+    app.rotation.dwell = args.dwell
+    app.rotation.page_interval = args.page_interval
+    app.watch_path = directory
+    app.start_auto_scan()
+    app.watcher.debounce = args.debounce
+    try:
+        peak = wait(app.catalog, pump=root.update)
+    finally:
+        app.stop_auto_scan()
+        app.writer.wait_idle(5.0)
+        stats = app.writer.stats()
+        app.on_closing()
+    return {'path': 'gui', 'watcher': 'inotify' if Inotify.available() else 'scandir',
+            'queue_peak': peak, 'writer': stats}
+
+
+def cli_loadtest(args):
+    """Result-file storm against the auto-scan, with a simulated port as the board."""
+    lock = Lock()
+    sent = Counter()  # (race, version) -> times its first page went on the wire
+    waited = {}  # race -> ms from parsed to taken from the queue
+    last_sent = [None]
+    done = Event()
+    checks = Counter()
+    ingested = set()  # names of files read completely
+
+    per_page = NUM_ROWS - 2
+
+    def hold(boats):
+        # Every race stays up for at least one turn of its pages
+        return max(args.dwell, -(-boats // per_page) * args.page_interval)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Single files far enough apart to be read alone, each arriving while
+        # the one before is still turning its pages
+        gap = args.debounce + 0.75
+        trickle_boats = per_page * max(1, int(-(-2 * gap // args.page_interval)))
+        storm = ResultStorm(directory, races=args.races, burst=args.burst, rate=args.rate, boats=args.boats,
+                            partial=args.partial, rename=args.rename, corrections=args.corrections,
+                            pause=args.pause, seed=args.seed, trickle=args.trickle,
+                            trickle_boats=trickle_boats, gap=gap)
+        missing = set(storm.final.items())
+        drain_limit = args.drain
+        if drain_limit is None:
+            drain_limit = 10.0 + sum(hold(storm.boats[f"Storm_R{race}_v{version[0]}_0.txt"])
+                                     for race, version in storm.final.items())
+
+        def on_record(record):
+            key = (record['race'], record['version'])
+            with lock:
+                if not sent[key]:
+                    waited[record['race']] = record['stages_ms'].get('dequeued', 0.0)
+                sent[key] += 1
+                last_sent[0] = time.monotonic()
+                missing.discard(key)
+                if not missing:
+                    done.set()
+
+        def checked(parse):
+            # A file read before it was complete shows fewer boats than were written
+            def parse_and_check(path):
+                try:
+                    pages = parse(path)
+                except Exception:
+                    checks['errors'] += 1
+                    raise
+                name = os.path.basename(path)
+                if len(pages.result.records) != storm.boats.get(name):
+                    checks['torn'] += 1
+                else:
+                    ingested.add(name)
+                return pages
+            return parse_and_check
+
+        def wait(catalog, pump):
+            """Run the storm; returns the deepest queue seen."""
+            thread = Thread(target=storm.run, name="storm", daemon=True)
+            time.sleep(0.2)  # let the watcher prime
+            thread.start()
+            peak = 0
+            while thread.is_alive() or not done.wait(0):
+                if pump:
+                    pump()
+                peak = max(peak, catalog.pending())
+                if not thread.is_alive() and time.monotonic() > storm.finished + drain_limit:
+                    break
+                time.sleep(0.002)
+            return peak
+
+        tracker = LatencyTracker(log_path=None, window=None, on_record=on_record)
+        ser = FakeSerial(pace=not args.no_pace)
+        cpu = time.process_time()
+        started = time.monotonic()
+        run = (loadtest_gui if args.gui else loadtest_headless)(args, directory, tracker, checked, ser, wait)
+        if run is None:
+            return 1
+        cpu = time.process_time() - cpu - storm.cpu
+    elapsed = time.monotonic() - started
+    with lock:
+        dropped = sorted(race for race, _ in missing)
+        unread = sorted(race for race, version in missing
+                        if f"Storm_R{race}_v{version[0]}_0.txt" not in ingested)
+        # From the last file closed to the last result on the wire
+        drain = max(0.0, last_sent[0] - storm.finished) if last_sent[0] else None
+        # A race arriving on an empty queue must preempt the one on the board at once
+        held_back = sorted(race for race in storm.trickle if waited.get(race, 0.0) > 100.0)
+    stats = tracker.stats()
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'path': run['path'], 'watcher': run['watcher'],
+        'files': len(storm.events) + len(storm.trickle), 'races': len(storm.final),
+        'trickle': len(storm.trickle), 'held_back': held_back,
+        'partial': storm.counts['partial'], 'renamed': storm.counts['rename'],
+        'corrections': sum(1 for version in storm.final.values() if version != "1.0"),
+        'dropped': dropped, 'never_read': unread, 'torn_reads': checks['torn'], 'load_errors': checks['errors'],
+        'sent_twice': sum(1 for count in sent.values() if count > 1),
+        'queue_peak': run['queue_peak'], 'drain_s': drain,
+        'frames_written': run['writer']['frames_written'], 'frames_coalesced': run['writer']['frames_coalesced'],
+        'elapsed_s': elapsed, 'cpu_s': cpu, 'cpu_percent': cpu / elapsed * 100,
+        'latency': stats,
+    }
+    print(f"{report['files']} Dateien für {report['races']} Rennen ({report['partial']} in zwei Teilen, "
+          f"{report['renamed']} umbenannt, {report['corrections']} Korrekturen) über den "
+          f"{'GUI' if args.gui else 'Daemon'}-Pfad ({run['watcher']})")
+    print(f"Verlorene Rennen: {len(dropped)}" + (f" {dropped[:20]}, davon nie eingelesen: {len(unread)}"
+                                                 if dropped else ""))
+    if storm.trickle:
+        print(f"Einzeln eingetroffen: {len(storm.trickle)} Rennen, nicht sofort gezeigt: {len(held_back)}"
+              + (f" {held_back}" if held_back else ""))
+    print(f"Halb gelesene Dateien: {checks['torn']}, Ladefehler: {checks['errors']}, "
+          f"doppelt gesendet: {report['sent_twice']}, Warteschlange max. {run['queue_peak']}")
+    print(f"{report['frames_written']} Frames gesendet, {report['frames_coalesced']} übersprungen"
+          + (f", letztes Rennen {drain:.2f} s nach der letzten Datei auf der Leitung" if drain is not None else ""))
+    print(f"CPU {cpu:.2f} s in {elapsed:.1f} s ({report['cpu_percent']:.1f} %, ohne Dateigenerator)")
+    if stats:
+        print("Datei geschrieben bis Frame auf der Leitung:")
+        print(tracker.report())
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if dropped or held_back else 0
+
+
+def cli_bench(args):
+    """Time the rendering and send hot paths against a fake serial port."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = bench_headless(args, directory)
+        benchmarks.update(bench_gui(args, directory))
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'benchmarks': benchmarks,
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f).get('benchmarks', {})
+    print(f"{'':<34}{'Aufrufe':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for name, summary in benchmarks.items():
+        if 'skipped' in summary:
+            print(f"{name:<34}übersprungen: {summary['skipped']}")
+            continue
+        line = (f"{name:<34}{summary['calls']:>8}{summary['p50_ms']:>10.3f}"
+                f"{summary['p90_ms']:>10.3f}{summary['p99_ms']:>10.3f}")
+        before = baseline.get(name, {}).get('p50_ms')
+        if before:
+            line += f"  {(summary['p50_ms'] / before - 1) * 100:+6.1f} % p50"
+        print(line)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+def cli_replay(args):
+    """Send a recorded session back through the send path, or list it."""
+    try:
+        records = read_session(args.file)
+        if args.list:
+            for record in records:
+                if not args.source or record.source == args.source:
+                    first_row = record.frame[:NUM_COLS].decode(ENCODING).rstrip()
+                    print(f"{datetime.fromtimestamp(record.time):%H:%M:%S.%f}  {record.source:<15} {first_row!r}")
+            return 0
+        writer = open_board(args, record=False)
+        if not writer:
+            return 1
+        count = 0
+        first = None
+        started = time.perf_counter()
+        try:
+            for record in records:
+                if args.source and record.source != args.source:
+                    continue
+                if first is None:
+                    first = record.time
+                if args.speed > 0:
+                    delay = (record.time - first) / args.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                elif not args.coalesce:
+                    # As fast as the line allows, without dropping frames
+                    while writer.backlog() >= writer.max_pending:
+                        time.sleep(wire_time(len(FRAME_HEADER) + FRAME_SIZE) / 2)
+                writer.submit(build_message(record.frame), coalesce=args.coalesce or args.speed > 0,
+                              source='replay')
+                count += 1
+            writer.wait_idle()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+    except OSError as e:
+        print(f"Sitzungsprotokoll nicht lesbar: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    stats = writer.stats()
+    print(f"{count} Frames in {elapsed:.1f} s wiedergegeben: {stats['frames_written']} gesendet, "
+          f"{stats['frames_coalesced']} übersprungen")
+    for name, board in stats.get('boards', {}).items():
+        print(f"  {name}: {board['frames_written']} gesendet, {board['frames_coalesced']} übersprungen, "
+              f"{board['bytes_per_second']:.0f} B/s, Rückstand {board['lag_ms']:.0f} ms")
+    return 0
+
+
+def cli_latency_report(args):
+    """Percentiles per stage from a latency log written by the GUI or the daemon."""
+    tracker = LatencyTracker(log_path=None, window=None)
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    tracker.add(json.loads(line))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Protokoll nicht lesbar: {e}", file=sys.stderr)
+        return 1
+    if not tracker.stats():
+        print("Protokoll ist leer")
+        return 0
+    print(tracker.report())
+    return 0
+
+
+def cli_bench_transcode(args):
+    """Time the translation tables against the per-character path on the same input."""
+    sample = "Ruderclub Grünau/Élan Café – Straße 7:03,21 € & Co [A] "
+    text = sample * (args.frames * FRAME_SIZE // len(sample) + 1)
+    lines = [text[i:i + NUM_COLS] for i in range(0, args.frames * FRAME_SIZE, NUM_COLS)]
+    frames = [lines[i:i + NUM_ROWS] for i in range(0, len(lines), NUM_ROWS)]
+    plain = Transcoder(fallbacks={})
+
+    def best(func):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    cases = [
+        ("zeichenweise", lambda: [encode_frame([sanitize_text(line) for line in frame]) for frame in frames]),
+        ("Tabellen", lambda: [plain.encode_frame(frame) for frame in frames]),
+        ("Tabellen + Ersatz", lambda: [DEFAULT_TRANSCODER.encode_frame(frame) for frame in frames]),
+        ("Datei zeichenweise", lambda: '\n'.join(sanitize_text(line) for line in lines)),
+        ("Datei Tabellen", lambda: plain.sanitize('\n'.join(lines))),
+    ]
+    print(f"{args.frames} Frames, {len(lines) * NUM_COLS} Zeichen, bestes von {args.repeat}")
+    results = {}
+    for name, func in cases:
+        seconds, results[name] = best(func)
+        print(f"{name:<20} {seconds * 1000:9.1f} ms  {len(lines) * NUM_COLS / seconds / 1e6:7.1f} MZeichen/s")
+    if results["zeichenweise"] != results["Tabellen"] or results["Datei zeichenweise"] != results["Datei Tabellen"]:
+        print("Abweichende Ausgabe!", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_gui(args):
+    import_tk()
     root = tk.Tk()
-    app = LEDMatrixApp(root, port_selector)
+    app = LEDMatrixApp(root, port=args.port, renderer=args.renderer,
+                       lamp_test=not args.skip_lamp_test, push_port=args.push_port, boards=args.board)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="LED-Matrix Editor; mit Unterbefehl ohne GUI (tkinter wird dann nicht geladen)")
+    parser.add_argument("--renderer", choices=sorted(GRID_VIEWS), default="entry",
+                        help="Raster-Darstellung: einzelne Entry-Felder oder ein Canvas")
+    parser.add_argument("--port", help="Serieller Port; ohne Angabe der zuletzt benutzte")
+    parser.add_argument("--baudrate", type=int, default=BAUDRATE, help=argparse.SUPPRESS)
+    parser.add_argument("--board", action="append", type=parse_board_spec, metavar="NAME=PORT[@QUELLE,...]",
+                        help="weitere Tafel neben --port, wiederholbar; mit Quellen nur diese "
+                             "(z. B. Zielturm=/dev/ttyUSB1@race_results); ersetzt 'boards' aus den Einstellungen")
+    parser.add_argument("--skip-lamp-test", action="store_true",
+                        help="Lampentest beim Start überspringen")
+    parser.add_argument("--push-port", type=int,
+                        help=f"Push-Schnittstelle: TCP/UDP auf PORT, HTTP auf PORT+1 (push: Standard {PUSH_PORT})")
+    parser.add_argument("--push-host", default="127.0.0.1")
+    commands = parser.add_subparsers(dest="command", metavar="BEFEHL")
+
+    results = commands.add_parser("send-results", help="Ergebnisdatei an die Tafel senden")
+    results.add_argument("file")
+    results.set_defaults(func=cli_send_results)
+
+    template = commands.add_parser("send-template", help="gespeicherte Vorlage senden")
+    template.add_argument("name", nargs="?", help="Name oder eindeutiger Anfang")
+    template.add_argument("--templates-file", default=TEMPLATE_STORE)
+    template.add_argument("--list", action="store_true", help="Namen auflisten (mit NAME: nur diesem Anfang)")
+    template.set_defaults(func=cli_send_template)
+
+    animation = commands.add_parser("send-animation", help="Animationsdatei abspielen")
+    animation.add_argument("file")
+    animation.add_argument("--fps", type=int, help="überschreibt #FPS aus der Datei")
+    animation.set_defaults(func=cli_send_animation)
+
+    ticker = commands.add_parser("send-ticker", help="Text als Laufschrift senden")
+    ticker.add_argument("text")
+    ticker.add_argument("--row", type=int, action="append", metavar="ZEILE",
+                        help=f"Zeile 1-{NUM_ROWS} (Standard {NUM_ROWS}), wiederholbar")
+    ticker.add_argument("--template", metavar="NAME", help="Vorlage für die übrigen Zeilen")
+    ticker.add_argument("--templates-file", default=TEMPLATE_STORE)
+    ticker.add_argument("--fps", type=float, default=TICKER_FPS, help="Spalten pro Sekunde")
+    ticker.add_argument("--loops", type=int, help="Durchläufe; ohne Angabe bis Strg+C")
+    ticker.set_defaults(func=cli_send_ticker)
+
+    daemon = commands.add_parser("daemon", help="Auto-Scan als Dauerprozess ohne GUI")
+    daemon.add_argument("--watch", required=True, help="Verzeichnis mit den Ergebnisdateien")
+    daemon.add_argument("--dwell", type=float, default=8.0,
+                        help="Sekunden pro Rennen, solange weitere warten")
+    daemon.add_argument("--playlist", metavar="FILE", help="Playlist zwischen den Ergebnissen abspielen")
+    daemon.set_defaults(func=cli_daemon)
+
+    push = commands.add_parser("push", help="Testclient für die Push-Schnittstelle")
+    content = push.add_mutually_exclusive_group()
+    content.add_argument("--result", metavar="FILE", help="Ergebnisdatei")
+    content.add_argument("--frame", metavar="FILE", help="240 Bytes Rohdaten")
+    content.add_argument("--template", metavar="NAME")
+    content.add_argument("--rows", nargs="+", metavar="ZEILE")
+    push.add_argument("--via", choices=("tcp", "udp", "http"), default="tcp")
+    push.add_argument("--burst", type=int, default=0, help="N nummerierte Frames auf einmal senden")
+    push.add_argument("--verbose", action="store_true", help="jede Antwort ausgeben")
+    push.set_defaults(func=cli_push)
+
+    emulate = commands.add_parser("emulate", help="Anzeigetafel auf einem Pseudo-Terminal nachbilden")
+    emulate.add_argument("--link", metavar="PFAD", help="Symlink auf das Terminal anlegen, z. B. /tmp/ttyLED")
+    emulate.add_argument("--show", action="store_true", help="jeden Frame vollständig ausgeben")
+    emulate.add_argument("--quiet", action="store_true", help="nur die Statistik am Ende")
+    emulate.add_argument("--no-pace", action="store_true", help="nicht auf Baudrate drosseln")
+    emulate.set_defaults(func=cli_emulate)
+
+    suite = commands.add_parser("bench", help="Heiße Pfade mit simuliertem Port messen")
+    suite.add_argument("--output", metavar="FILE", help="Ergebnisse als JSON speichern")
+    suite.add_argument("--compare", metavar="FILE", help="mit früherem JSON-Ergebnis vergleichen")
+    suite.add_argument("--calls", type=int, default=200, help="Aufrufe je Messung")
+    suite.add_argument("--repeat", type=int, default=5, help="Durchläufe für große Animationen")
+    suite.add_argument("--animation-frames", type=int, default=2000)
+    suite.add_argument("--scan-cycles", type=int, default=20)
+    suite.add_argument("--debounce", type=float, default=0.25, help="Wartezeit des Auto-Scans")
+    suite.set_defaults(func=cli_bench)
+
+    replay = commands.add_parser("replay", help="aufgezeichnete Sitzung erneut senden")
+    replay.add_argument("file")
+    replay.add_argument("--speed", type=float, default=1.0,
+                        help="1 = Echtzeit, 10 = zehnfach, 0 = so schnell wie die Leitung erlaubt")
+    replay.add_argument("--coalesce", action="store_true",
+                        help="bei --speed 0 Frames überspringen statt auf die Leitung zu warten")
+    replay.add_argument("--source", choices=SESSION_SOURCES, help="nur Frames dieser Quelle")
+    replay.add_argument("--list", action="store_true", help="Aufzeichnung nur auflisten")
+    replay.set_defaults(func=cli_replay)
+
+    load = commands.add_parser("loadtest", help="Sturm von Ergebnisdateien gegen den Auto-Scan testen")
+    load.add_argument("--races", type=int, default=100)
+    load.add_argument("--burst", type=int, default=10, help="Dateien je Schub")
+    load.add_argument("--rate", type=float, default=20.0, help="Dateien pro Sekunde im Mittel")
+    load.add_argument("--boats", type=int, default=14, help="höchstens so viele Boote je Rennen")
+    load.add_argument("--partial", type=float, default=0.2, help="Anteil in zwei Teilen geschriebener Dateien")
+    load.add_argument("--pause", type=float, default=0.1, help="Sekunden zwischen den zwei Teilen")
+    load.add_argument("--rename", type=float, default=0.2, help="Anteil unter .tmp geschriebener Dateien")
+    load.add_argument("--corrections", type=float, default=0.2, help="Anteil Rennen mit v2")
+    load.add_argument("--trickle", type=int, default=3,
+                      help="so viele Rennen vorab einzeln in die leere Warteschlange")
+    load.add_argument("--seed", type=int, default=1)
+    load.add_argument("--dwell", type=float, default=0.0, help="Sekunden pro Rennen, solange weitere warten")
+    load.add_argument("--page-interval", type=float, default=0.2)
+    load.add_argument("--debounce", type=float, default=0.25, help="Wartezeit des Auto-Scans")
+    load.add_argument("--drain", type=float,
+                      help="so lange nach der letzten Datei auf ausstehende Rennen warten "
+                           "(Standard: genug für eine Seitenrunde je Rennen)")
+    load.add_argument("--scandir", action="store_true",
+                      help="Verzeichnis abfragen statt inotify, wie unter Windows (nur Daemon-Pfad)")
+    load.add_argument("--no-pace", action="store_true", help="simulierten Port nicht auf Baudrate drosseln")
+    load.add_argument("--gui", action="store_true", help="über LEDMatrixApp statt den Daemon (braucht Display)")
+    load.add_argument("--output", metavar="FILE", help="Ergebnis als JSON speichern")
+    load.set_defaults(func=cli_loadtest)
+
+    report = commands.add_parser("latency-report", help="Latenz-Protokoll auswerten")
+    report.add_argument("file", nargs="?", default=LATENCY_LOG)
+    report.set_defaults(func=cli_latency_report)
+
+    bench = commands.add_parser("bench-transcode", help="Zeichensatz-Umsetzung messen")
+    bench.add_argument("--frames", type=int, default=20000)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.set_defaults(func=cli_bench_transcode)
+
+    for command in (results, daemon):
+        command.add_argument("--title", default=RESULT_TITLE, help="ersetzt die Titelzeile")
+        command.add_argument("--page-interval", type=float, default=4.0,
+                             help="Sekunden pro Seite bei mehr als sechs Booten")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return run_gui(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())